@@ -1,135 +1,159 @@
-import pygame
-import sys
-
-pygame.init()
-
-WIDTH, HEIGHT = 1000, 800
-WIN = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("logic game")
-
-clock = pygame.time.Clock()
-
-BG = pygame.image.load("bg_offwhite.jpg")
-font = pygame.font.SysFont("garamond", 45)
-smallfont = pygame.font.SysFont("garamond", 20)
-black = (10, 10, 10)
-grey = (112, 128, 144)
-blue = (0, 0, 255)
-
-
-class TextInputBox:
-    def __init__(self, x, y, width, height, font, text_color, inactive_color, active_color):
-        self.rect = pygame.Rect(x, y, width, height)
-        self.color = inactive_color
-        self.text = ''
-        self.font = font
-        self.text_color = text_color
-        self.active_color = active_color
-        self.inactive_color = inactive_color
-        self.active = False
-
-    def handle_event(self, event):
-        if event.type == pygame.MOUSEBUTTONDOWN:
-            if self.rect.collidepoint(event.pos):
-                self.active = not self.active
-            else:
-                self.active = False
-            self.color = self.active_color if self.active else self.inactive_color
-        if event.type == pygame.KEYDOWN:
-            if self.active:
-                if event.key == pygame.K_RETURN:
-                    print(self.text)
-                    self.text = ''
-                elif event.key == pygame.K_BACKSPACE:
-                    self.text = self.text[:-1]
-                else:
-                    self.text += event.unicode
-
-    def draw(self, win):
-        txt_surface = self.font.render(self.text, True, self.text_color)
-        width = max(self.rect.w, txt_surface.get_width()+10)
-        self.rect.w = width
-        win.blit(txt_surface, (self.rect.x+5, self.rect.y+5))
-        pygame.draw.rect(win, self.color, self.rect, 2)
-
-
-def create_button(msg, x, y, hc, dc, fc):
-    button_width = 150
-    button_height = 50
-
-    mouse = pygame.mouse.get_pos()
-    click = pygame.mouse.get_pressed(3)
-
-    if (x + button_width > mouse[0] > x and y + button_height > mouse[1] > y):
-        pygame.draw.rect(WIN, hc, (x, y, button_width, button_height))
-        if click[0] == 1:
-            return True
-    else:
-        pygame.draw.rect(WIN, dc, (x, y, button_width, button_height))
-
-    buttontext = smallfont.render(msg, True, fc)
-    text_rect = buttontext.get_rect(center=(x + button_width / 2, y + button_height / 2))
-    WIN.blit(buttontext, text_rect)
-
-
-def login():
-    login_text = font.render("Login Page", True, black)
-    username_text = smallfont.render("Username: ", True, black)
-    key_text = smallfont.render("Key(Optional): ", True, black)
-
-    username_box = TextInputBox(200, 320, 140, 32, smallfont, black, grey, blue)
-    key_box = TextInputBox(200, 420, 140, 32, smallfont, black, grey, blue)
-
-    while True:
-        WIN.blit(BG, (0, 0))
-        WIN.blit(login_text, ((WIDTH - login_text.get_width()) / 2, 25))
-        WIN.blit(username_text, (50, 325))
-        WIN.blit(key_text, (50, 425))
-
-        username_box.draw(WIN)
-        key_box.draw(WIN)
-
-        p_button = create_button("Proceed", WIDTH / 2 - 75, 500, grey, blue, black)
-
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            username_box.handle_event(event)
-            key_box.handle_event(event)
-
-        with open('usernames.txt', 'r') as file:
-            with open ('keys.txt', 'r') as file2:
-                content = file.read()
-                content2 = file2.read()
-                if username_box.text in content:
-                    if p_button and key_box.text == '':
-                        print("Proceed to main menu")
-                        return True
-                    elif p_button and key_box.text in content2:
-                        print("Proceed to main menu as instructor/developer")
-                        return True
-
-
-
-
-
-
-        pygame.display.update()
-        clock.tick(15)
-
-
-def main():
-    run = True
-    while run:
-        if login():
-            run = False
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                run = False
-                break
-    pygame.quit()
-
-
-if __name__ == "__main__":
-    main()
+import pygame
+
+import assets
+import persistence
+import question_store
+import text_cache
+from user_directory import UserDirectory
+from landingPage import LandingScene
+from scene_manager import Scene, run
+
+black = (10, 10, 10)
+grey = (112, 128, 144)
+blue = (0, 0, 255)
+
+
+class TextInputBox:
+    def __init__(self, x, y, width, height, font, text_color, inactive_color, active_color):
+        self.rect = pygame.Rect(x, y, width, height)
+        self.color = inactive_color
+        self.text = ''
+        self.font = font
+        self.text_color = text_color
+        self.active_color = active_color
+        self.inactive_color = inactive_color
+        self.active = False
+
+    def handle_event(self, event):
+        if event.type == pygame.MOUSEBUTTONDOWN:
+            if self.rect.collidepoint(event.pos):
+                self.active = not self.active
+            else:
+                self.active = False
+            self.color = self.active_color if self.active else self.inactive_color
+        if event.type == pygame.KEYDOWN:
+            if self.active:
+                if event.key == pygame.K_RETURN:
+                    print(self.text)
+                    self.text = ''
+                elif event.key == pygame.K_BACKSPACE:
+                    self.text = self.text[:-1]
+                else:
+                    self.text += event.unicode
+
+    def draw(self, win):
+        txt_surface = text_cache.render(self.font, self.text, self.text_color)
+        width = max(self.rect.w, txt_surface.get_width()+10)
+        self.rect.w = width
+        win.blit(txt_surface, (self.rect.x+5, self.rect.y+5))
+        pygame.draw.rect(win, self.color, self.rect, 2)
+
+
+def create_button(win, font, msg, rect, hc, dc, fc, mouse_pos):
+    # The mouse position comes from the scene's events, so replays draw the same hover
+    if rect.collidepoint(mouse_pos):
+        pygame.draw.rect(win, hc, rect)
+    else:
+        pygame.draw.rect(win, dc, rect)
+
+    buttontext = text_cache.render(font, msg, fc)
+    text_rect = buttontext.get_rect(center=rect.center)
+    win.blit(buttontext, text_rect)
+
+
+class LoginScene(Scene):
+    caption = "logic game"
+    fps = 15
+
+    def __init__(self, manager):
+        super().__init__(manager)
+        # Get the background and the question bank ready while the user is typing.
+        # The page starts on the plain fill and swaps the background in once it's loaded
+        self.warmer = assets.warm(self.size, question_store.build)
+        self.BG = assets.plain_background(self.size)
+        self.background_loaded = False
+        self.font = assets.get_font("garamond", 45)
+        self.smallfont = assets.get_font("garamond", 20)
+        # The other screens' fonts; SDL_ttf is not thread safe so these are made here, not by warm()
+        assets.preload_fonts()
+
+        self.login_text = self.font.render("Login Page", True, black)
+        self.username_text = self.smallfont.render("Username: ", True, black)
+        self.key_text = self.smallfont.render("Key(Optional): ", True, black)
+
+        self.username_box = TextInputBox(200, 320, 140, 32, self.smallfont, black, grey, blue)
+        self.key_box = TextInputBox(200, 420, 140, 32, self.smallfont, black, grey, blue)
+
+        # Loaded once here; login() only re-reads the files if they changed
+        self.directory = UserDirectory()
+        self.mouse_pos = (-1, -1)
+
+    def on_resize(self, width, height):
+        # The warmer made the background for the old size; this one loads here
+        self.BG = assets.get_background((width, height))
+        self.background_loaded = True
+
+    def is_active(self):
+        # Keep drawing until the background has been swapped in
+        return not self.background_loaded
+
+    def update(self):
+        if not self.background_loaded:
+            background = assets.loaded_background(self.size)
+            if background is None and not self.warmer.is_alive():
+                # The warmer couldn't load it; this reports why and falls back to the plain fill
+                background = assets.get_background(self.size)
+            if background is not None:
+                self.BG = background
+                self.background_loaded = True
+
+    def proceed_rect(self):
+        return pygame.Rect(self.manager.width // 2 - 75, 500, 150, 50)
+
+    def handle_event(self, event):
+        self.username_box.handle_event(event)
+        self.key_box.handle_event(event)
+        if event.type in (pygame.MOUSEMOTION, pygame.MOUSEBUTTONDOWN):
+            self.mouse_pos = event.pos
+        if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1 \
+                and self.proceed_rect().collidepoint(event.pos):
+            self.login()
+
+    def proceed(self, instructor):
+        username = self.username_box.text.strip()
+        self.manager.username = username
+        self.manager.is_instructor = instructor
+        persistence.atomic_write('cur_username.txt', username)
+
+        self.manager.replace(LandingScene(self.manager))
+
+    def draw(self, win):
+        width = self.manager.width
+        win.blit(self.BG, (0, 0))
+        win.blit(self.login_text, ((width - self.login_text.get_width()) / 2, 25))
+        win.blit(self.username_text, (50, 325))
+        win.blit(self.key_text, (50, 425))
+
+        self.username_box.draw(win)
+        self.key_box.draw(win)
+
+        create_button(win, self.smallfont, "Proceed", self.proceed_rect(), grey, blue, black, self.mouse_pos)
+
+    def login(self):
+        # Pick up roster changes made since the login page opened
+        self.directory.refresh()
+        if self.directory.has_user(self.username_box.text):
+            if self.key_box.text.strip() == '':
+                print("Proceed to main menu")
+                self.proceed(False)
+            elif self.directory.check_key(self.key_box.text):
+                print("Proceed to main menu as instructor/developer")
+                self.proceed(True)
+
+
+def main():
+    run(LoginScene)
+
+
+if __name__ == "__main__":
+    main()
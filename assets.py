@@ -0,0 +1,216 @@
+"""
+Shared asset cache for the game.
+
+Every screen runs inside the same process (see scene_manager.py), so images
+and fonts only need to be loaded once. Scenes ask this module for what they
+need instead of calling pygame.image.load or pygame.font.SysFont themselves.
+
+Images are converted to the display's pixel format as they are loaded, so
+blitting them never converts pixels again, and each scaled size is made once.
+warm() prepares the background on a background thread while the login page
+is showing, and preload_fonts() creates the fonts every scene uses, so opening
+a mode does not wait on either.
+"""
+import os
+import threading
+from collections import OrderedDict
+
+import pygame
+
+# Where the background may be, in order of preference
+BACKGROUND_PATHS = ("backgrounds/bg_offwhite.jpg", "bg_offwhite.jpg")
+# Used instead of the background image if it cannot be found
+OFF_WHITE = (245, 243, 238)
+
+# The fonts the scenes and the profiler overlay use, created up front by preload_fonts()
+FONTS = [
+    ("arial", 20), ("arial", 45), ("arial", 50), ("arial", 60), ("arial", 80), ("arial", 100),
+    (None, 24), (None, 32), (None, 50), (None, 45, True),
+    ("garamond", 20), ("garamond", 45),
+]
+
+# Resizing the window makes a scaled variant per size; only the latest few are kept
+MAX_SCALED = 4
+
+_images = {}
+_scaled = OrderedDict()
+_fonts = {}
+# Held while loading, so a scene asking for an image the warmer is busy with waits for it
+_lock = threading.RLock()
+_warmer = None
+
+
+def _convert(surface):
+    # Without a display there is no pixel format to convert to yet
+    if pygame.display.get_surface() is None:
+        return surface
+    if surface.get_flags() & pygame.SRCALPHA:
+        return surface.convert_alpha()
+    return surface.convert()
+
+
+def _remember(key, surface):
+    _scaled[key] = surface
+    if len(_scaled) > MAX_SCALED:
+        _scaled.popitem(last=False)
+    return surface
+
+
+def get_image(path, size=None):
+    """
+    Returns an image, loading it from disk the first time it is requested.
+    Args:
+        path (str): The file path of the image.
+        size (tuple): Optional (width, height) to scale the image to.
+    Returns:
+        pygame.Surface: The (possibly scaled) image.
+    """
+    if size is None:
+        image = _images.get(path)
+        if image is None:
+            with _lock:
+                image = _images.get(path)
+                if image is None:
+                    image = _images[path] = _convert(pygame.image.load(path))
+        return image
+
+    key = (path, tuple(size))
+    with _lock:
+        image = _scaled.get(key)
+        if image is None:
+            image = _remember(key, _convert(pygame.transform.scale(get_image(path), key[1])))
+        else:
+            _scaled.move_to_end(key)
+    return image
+
+
+def background_path():
+    """
+    Returns:
+        str: The first background image that exists, or None if there is none.
+    """
+    for path in BACKGROUND_PATHS:
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def get_background(size):
+    """
+    Returns the background scaled to the window, or a plain off-white surface if
+    the image is missing.
+    Args:
+        size (tuple): The (width, height) of the window.
+    Returns:
+        pygame.Surface: The background.
+    """
+    path = background_path()
+    if path is not None:
+        try:
+            return get_image(path, size)
+        except pygame.error as e:
+            print(f"Could not load the background {path}: {e}")
+    return plain_background(size)
+
+
+def plain_background(size):
+    """
+    Returns a plain off-white surface the size of the window, what get_background
+    falls back to when the image is missing.
+    Args:
+        size (tuple): The (width, height) of the window.
+    Returns:
+        pygame.Surface: The background.
+    """
+    key = (None, tuple(size))
+    with _lock:
+        surface = _scaled.get(key)
+        if surface is None:
+            surface = _remember(key, _convert(pygame.Surface(key[1])))
+            surface.fill(OFF_WHITE)
+    return surface
+
+
+def loaded_background(size):
+    """
+    Returns the background scaled to the window if it has been made already,
+    without loading anything.
+    Args:
+        size (tuple): The (width, height) of the window.
+    Returns:
+        pygame.Surface: The background, or None if it is not ready.
+    """
+    return _scaled.get((background_path(), tuple(size)))
+
+
+def get_font(name, size, bold=False):
+    """
+    Returns a system font, creating it the first time it is requested.
+    Args:
+        name (str): The font name, or None for pygame's default font.
+        size (int): The font size.
+        bold (bool): Whether the font should be bold.
+    Returns:
+        pygame.font.Font: The font object.
+    """
+    # SysFont ignores case, so "Arial" and "arial" are the same font
+    key = (name.lower() if name else None, size, bold)
+    font = _fonts.get(key)
+    if font is None:
+        font = _fonts[key] = pygame.font.SysFont(key[0], size, bold=bold)
+    return font
+
+
+def new_font(name, size, bold=False):
+    """
+    Creates a font object of its own instead of the shared one, for rendering
+    on another thread. SDL_ttf fonts must not be used from two threads at once,
+    so only that thread may use it, and it must still be created on the main thread.
+    Args:
+        name (str): The font name, or None for pygame's default font.
+        size (int): The font size.
+        bold (bool): Whether the font should be bold.
+    Returns:
+        pygame.font.Font: The font object.
+    """
+    return pygame.font.SysFont(name.lower() if name else None, size, bold=bold)
+
+
+def _warm(size, loaders):
+    try:
+        get_background(size)
+    except pygame.error as e:
+        print(f"Could not preload the background: {e}")
+    for loader in loaders:
+        try:
+            loader()
+        except Exception as e:
+            # The scene that needs it will load it again and report the error properly
+            print(f"Could not preload {getattr(loader, '__qualname__', loader)}: {e}")
+
+
+def warm(size, *loaders):
+    """
+    Starts decoding, scaling and converting the background for the window size
+    on a background thread, then runs any other loaders given, e.g. the question
+    bank. Calling it again while it runs does nothing.
+    Args:
+        size (tuple): The (width, height) of the window.
+        loaders (function): Further functions that fill a cache when called.
+    Returns:
+        threading.Thread: The thread doing the work.
+    """
+    global _warmer
+    if _warmer is None or not _warmer.is_alive():
+        _warmer = threading.Thread(target=_warm, args=(size, loaders), name="asset-warmer", daemon=True)
+        _warmer.start()
+    return _warmer
+
+
+def preload_fonts():
+    """
+    Creates every font the scenes use. SDL_ttf is not thread safe, so unlike
+    the images this runs on the main thread.
+    """
+    for name, size, *bold in FONTS:
+        get_font(name, size, *bold)
@@ -0,0 +1,46 @@
+"""
+Throughput benchmark for the procedural question generator.
+
+Generates batches of questions and reports how many questions per second the
+generator produces for each batch size.
+
+Usage:
+    python benchmark_generator.py              # batches of 1k, 100k and 1M
+    python benchmark_generator.py 1000 50000   # custom batch sizes
+"""
+import itertools
+import sys
+import time
+
+from question_generator import generate_questions
+
+DEFAULT_BATCH_SIZES = (1_000, 100_000, 1_000_000)
+
+
+def benchmark(batch_size, seed=0):
+    """
+    Times the generation of one batch of questions.
+    Args:
+        batch_size (int): The number of questions to generate.
+        seed: Seed for the generator, so runs are comparable.
+    Returns:
+        float: Questions generated per second.
+    """
+    questions = generate_questions(seed)
+    start = time.perf_counter()
+    for _ in itertools.islice(questions, batch_size):
+        pass
+    elapsed = time.perf_counter() - start
+    return batch_size / elapsed
+
+
+def main(argv):
+    batch_sizes = [int(arg) for arg in argv] or DEFAULT_BATCH_SIZES
+    print(f"{'batch size':>12} {'questions/s':>14}")
+    for batch_size in batch_sizes:
+        rate = benchmark(batch_size)
+        print(f"{batch_size:>12,} {rate:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
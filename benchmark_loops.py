@@ -0,0 +1,488 @@
+"""
+Headless benchmark for the game screens.
+
+Runs each screen under SDL's dummy video driver and drives it with a scripted
+stream of input (dragging answers into the box, building formulas from tiles,
+clicking Next Question, pausing and resuming, scrolling, typing, logging in) instead of a
+person clicking. Frames run back to back without the frame rate cap, and for
+each screen it records:
+
+- fps: frames per second over the run,
+- frame_ms: frame time percentiles (p50, p90, p99 and max) in milliseconds,
+- net_blocks_per_frame: the average net change in allocated Python memory blocks per frame
+  (blocks allocated minus blocks freed, so it can be negative),
+- alloc_peak_kib_per_frame: the average peak of memory allocated during a frame (a second, traced run),
+- peak_rss_kib: the peak resident memory of the process running the screen.
+
+Every screen runs in its own process, in a scratch directory holding a copy
+of the question files, so peak memory is per screen and the benchmark never
+touches the real saves or scores.
+
+With --check-redraw it measures nothing and instead redraws the whole screen
+after every frame, comparing it with what drawing only the dirty rectangles
+left on the display. It reports every frame that differs and exits with
+status 1 if there are any.
+
+Usage:
+    python benchmark_loops.py                            # every screen, results in benchmark_loops.json
+    python benchmark_loops.py training lightning         # some screens
+    python benchmark_loops.py --rounds 100 --size 1920x1080 --output results.json
+    python benchmark_loops.py --check-redraw             # dirty-rectangle frames against full redraws
+"""
+import argparse
+import concurrent.futures
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import pygame
+
+import scratch_data
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+SCENES = ('login', 'training', 'lightning', 'construction', 'instructor', 'leaderboard')
+DEFAULT_ROUNDS = 30
+DEFAULT_SIZE = (1000, 800)
+DEFAULT_OUTPUT = 'benchmark_loops.json'
+# Players put in the scratch score table, so the leaderboard has pages to scroll through
+LEADERBOARD_PLAYERS = 5000
+USERNAME = 'bench'
+
+# How many motion events a scripted drag is made of
+DRAG_STEPS = 12
+
+
+class ScriptedScheduler:
+    """
+    Stands in for the scene manager's FrameScheduler. Each frame it hands out
+    the next batch of scripted events without waiting, and measures the frame
+    that just finished.
+
+    Attributes:
+        frame_times (list[float]): The time each frame took, in seconds.
+        net_blocks (list[int]): The net change in allocated blocks in each frame (allocated minus freed).
+        alloc_peaks (list[int]): The peak bytes allocated in each frame, when tracing.
+    """
+    def __init__(self, script, trace=False):
+        self.script = script
+        self.trace = trace
+        self.frame_times = []
+        self.net_blocks = []
+        self.alloc_peaks = []
+        self._frame_start = None
+        self._blocks = 0
+        self._traced = 0
+
+    def next_events(self, fps, active):
+        end = time.perf_counter()
+        if self._frame_start is not None:
+            self.frame_times.append(end - self._frame_start)
+            self.net_blocks.append(sys.getallocatedblocks() - self._blocks)
+            if self.trace:
+                current, peak = tracemalloc.get_traced_memory()
+                self.alloc_peaks.append(peak - self._traced)
+
+        # Drop whatever the dummy driver queued itself; only the script is input
+        pygame.event.get()
+        events = next(self.script, None)
+        if events is None:
+            events = [pygame.event.Event(pygame.QUIT)]
+
+        if self.trace:
+            tracemalloc.reset_peak()
+            self._traced = tracemalloc.get_traced_memory()[0]
+        self._blocks = sys.getallocatedblocks()
+        self._frame_start = time.perf_counter()
+        return events
+
+    def stats(self):
+        return {}
+
+
+class RedrawCheck(ScriptedScheduler):
+    """
+    A ScriptedScheduler that also redraws the whole scene after every frame and
+    compares it with what the dirty-rectangle redraw left on the display.
+
+    Attributes:
+        mismatches (list[tuple]): (frame, number of differing pixels) for each frame that differed.
+    """
+    def __init__(self, script, manager):
+        super().__init__(script)
+        self.manager = manager
+        self.mismatches = []
+
+    def next_events(self, fps, active):
+        scene = self.manager.top
+        if self._frame_start is not None and scene is not None and scene.tracks_dirty:
+            display = self.manager.display
+            full = pygame.Surface(display.get_size(), 0, display)
+            scene.draw(full)
+            if pygame.image.tobytes(full, 'RGB') != pygame.image.tobytes(display, 'RGB'):
+                differing = (pygame.surfarray.array3d(full) != pygame.surfarray.array3d(display)).any(axis=2)
+                self.mismatches.append((len(self.frame_times), int(differing.sum())))
+        return super().next_events(fps, active)
+
+
+def _mouse(kind, pos, **extra):
+    return pygame.event.Event(kind, pos=tuple(int(v) for v in pos), button=1, **extra)
+
+
+def click(pos):
+    yield [_mouse(pygame.MOUSEBUTTONDOWN, pos)]
+    yield [_mouse(pygame.MOUSEBUTTONUP, pos)]
+
+
+def drag(start, end, steps=DRAG_STEPS):
+    """Yields the frames of a drag from start to end, one motion event per frame."""
+    yield [_mouse(pygame.MOUSEBUTTONDOWN, start)]
+    for i in range(1, steps + 1):
+        pos = (start[0] + (end[0] - start[0]) * i / steps, start[1] + (end[1] - start[1]) * i / steps)
+        yield [pygame.event.Event(pygame.MOUSEMOTION, pos=tuple(int(v) for v in pos), rel=(0, 0), buttons=(1, 0, 0))]
+    yield [_mouse(pygame.MOUSEBUTTONUP, end)]
+
+
+def key(k, unicode=''):
+    yield [pygame.event.Event(pygame.KEYDOWN, key=k, mod=0, unicode=unicode, scancode=0)]
+    yield [pygame.event.Event(pygame.KEYUP, key=k, mod=0, unicode=unicode, scancode=0)]
+
+
+def idle(frames):
+    for _ in range(frames):
+        yield []
+
+
+def _center(button):
+    return button.x + button.width / 2, button.y + button.height / 2
+
+
+def _answer_drag(scene):
+    # Drags the correct answer, or the first one if none is marked correct, into the box
+    items = scene.items
+    item = next((item for item in items if item.is_ans()), items[0])
+    yield from drag(item.rect.center, pygame.Rect(item.sol_box).center)
+
+
+def _edge_drag(scene):
+    # Drags a wrong answer onto the box's corner and on past its far side, so the
+    # dirty areas of the drag cut through the box's border
+    items = scene.items
+    item = next((item for item in items if not item.is_ans()), items[0])
+    box = pygame.Rect(item.sol_box)
+    yield from drag(item.rect.center, box.topleft)
+    yield from drag(box.topleft, (box.right + 60, box.top - 10))
+
+
+def _pause(manager, i):
+    # Pauses, then resumes with the RESUME button or with Escape
+    yield from key(pygame.K_p)
+    yield from idle(5)
+    if i % 20 == 5:
+        yield from click(manager.top.resume_game.top_rect.center)
+    else:
+        yield from key(pygame.K_ESCAPE)
+    # The pause menu closes at the start of the next frame
+    yield from idle(2)
+
+
+def training_script(manager, rounds):
+    for i in range(rounds):
+        scene = manager.top
+        if i % 3 == 1:
+            yield from _edge_drag(scene)
+        yield from _answer_drag(scene)
+        yield from idle(5)
+        if i % 10 == 5:
+            yield from _pause(manager, i)
+        yield from click(_center(scene.next_question_button))
+
+
+def lightning_script(manager, rounds):
+    for i in range(rounds):
+        scene = manager.top
+        if i % 4 == 3:
+            # Skip a question
+            yield from click(_center(scene.next_question_button))
+        else:
+            yield from _answer_drag(scene)
+        # The timer keeps the screen redrawing while nothing happens
+        yield from idle(10)
+        if i % 10 == 5:
+            yield from _pause(manager, i)
+
+
+def construction_script(manager, rounds):
+    for i in range(rounds):
+        scene = manager.top
+        if i % 5 == 4:
+            # Fill the blanks with whatever comes first, then start again
+            for slot, tile in zip(scene.slots, scene.tiles):
+                yield from drag(tile.rect.center, slot.center)
+            yield from click(_center(scene.clear_button))
+        # Build the answer one symbol at a time, left to right
+        for slot, symbol in zip(scene.slots, scene.key_tokens):
+            tile = next(tile for tile in scene.tiles if tile.text == symbol and scene.slot_of[tile] is None)
+            yield from drag(tile.rect.center, slot.center)
+        yield from idle(3)
+        yield from click(_center(scene.next_question_button))
+
+
+def instructor_script(manager, rounds):
+    for i in range(rounds):
+        scene = manager.top
+        yield from _answer_drag(scene)
+        yield from click(_center(scene.see_answer_button))
+        yield from idle(3)
+        yield from click(_center(scene.see_answer_button))
+        if i % 5 == 4:
+            yield from click(_center(scene.prev_question_button))
+        yield from click(_center(scene.next_question_button))
+
+
+def leaderboard_script(manager, rounds):
+    for i in range(rounds):
+        yield from key(pygame.K_PAGEDOWN)
+        yield [pygame.event.Event(pygame.MOUSEWHEEL, x=0, y=-1, flipped=False)]
+        yield from idle(3)
+        if i % 10 == 9:
+            yield [pygame.event.Event(pygame.MOUSEWHEEL, x=0, y=10, flipped=False)]
+
+
+def login_script(manager, rounds):
+    scene = manager.top
+    yield from click(scene.username_box.rect.center)
+    for i in range(rounds):
+        for char in USERNAME:
+            yield from key(getattr(pygame, f'K_{char}'), char)
+        for _ in USERNAME:
+            yield from key(pygame.K_BACKSPACE)
+        yield from idle(5)
+    # Log in, which opens the landing page
+    for char in USERNAME:
+        yield from key(getattr(pygame, f'K_{char}'), char)
+    yield from click(scene.proceed_rect().center)
+    yield from idle(5)
+
+
+def _scenario(name):
+    # Imported here so the scratch directory is in place first
+    if name == 'login':
+        from Sign_in import LoginScene
+        return LoginScene, login_script
+    if name == 'training':
+        from trainingmode import TrainingScene
+        return TrainingScene, training_script
+    if name == 'lightning':
+        from lightningmode import LightningScene
+        return LightningScene, lightning_script
+    if name == 'construction':
+        from constructionmode import ConstructionScene
+        return ConstructionScene, construction_script
+    if name == 'instructor':
+        from instructorMode import InstructorScene
+        return InstructorScene, instructor_script
+    if name == 'leaderboard':
+        from Leaderboard import LeaderboardScene
+        return LeaderboardScene, leaderboard_script
+    raise ValueError(f"unknown screen {name!r}; choose from {', '.join(SCENES)}")
+
+
+def prepare_directory(source, target):
+    """
+    Fills a scratch directory with copies of the game's data files, a roster
+    holding the benchmark user and a score table to scroll through.
+    """
+    scratch_data.prepare_directory(source, target)
+    for name in ('usernames.txt', 'cur_username.txt'):
+        with open(os.path.join(target, name), 'w') as f:
+            f.write(USERNAME + '\n')
+
+    import score_store
+    store = score_store.ScoreStore(os.path.join(target, score_store.DB_FILE), legacy_path=None)
+    with store.conn:
+        for i in range(LEADERBOARD_PLAYERS):
+            store._upsert(f"player{i}", (i * 7919) % 1000)
+    store.close()
+
+
+def _drive(name, size, rounds, trace, check=False):
+    from scene_manager import SceneManager
+
+    scene_cls, script = _scenario(name)
+    manager = SceneManager(size)
+    manager.username = USERNAME
+    manager.is_instructor = True
+    if check:
+        manager.scheduler = RedrawCheck(script(manager, rounds), manager)
+    else:
+        manager.scheduler = ScriptedScheduler(script(manager, rounds), trace)
+    manager.push(scene_cls(manager))
+    start = time.perf_counter()
+    manager.run()
+    elapsed = time.perf_counter() - start
+    return manager.scheduler, elapsed
+
+
+def _percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def run_scenario(args):
+    """
+    Benchmarks one screen in a scratch directory. Meant to run in a fresh process.
+    Args:
+        args (tuple): (screen name, source directory, window size, rounds).
+    Returns:
+        dict: The results for the screen.
+    """
+    name, source, size, rounds = args
+    sys.path.insert(0, source)
+    with tempfile.TemporaryDirectory(prefix='logic-quest-bench-') as scratch:
+        prepare_directory(source, scratch)
+        os.chdir(scratch)
+
+        scheduler, elapsed = _drive(name, size, rounds, trace=False)
+        # Allocation sizes come from a second run, since tracing slows every frame down
+        tracemalloc.start()
+        traced, _ = _drive(name, size, rounds, trace=True)
+        tracemalloc.stop()
+        # No pygame.quit() here: the asset caches still hold fonts that would be freed under them
+        os.chdir(source)
+
+    frame_ms = [t * 1000 for t in scheduler.frame_times] or [0.0]
+    peak_rss = None
+    if resource is not None:
+        peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        if sys.platform == 'darwin':  # reported in bytes rather than KiB
+            peak_rss //= 1024
+    return {
+        'screen': name,
+        'frames': len(scheduler.frame_times),
+        'seconds': round(elapsed, 4),
+        'fps': round(len(scheduler.frame_times) / elapsed, 1) if elapsed else 0.0,
+        'frame_ms': {
+            'p50': round(_percentile(frame_ms, 0.50), 3),
+            'p90': round(_percentile(frame_ms, 0.90), 3),
+            'p99': round(_percentile(frame_ms, 0.99), 3),
+            'max': round(max(frame_ms), 3),
+        },
+        'net_blocks_per_frame': round(sum(scheduler.net_blocks) / max(1, len(scheduler.net_blocks)), 2),
+        'alloc_peak_kib_per_frame': round(sum(traced.alloc_peaks) / max(1, len(traced.alloc_peaks)) / 1024, 2),
+        'peak_rss_kib': peak_rss,
+    }
+
+
+def check_scenario(args):
+    """
+    Compares one screen's dirty-rectangle frames with full redraws in a scratch
+    directory. Meant to run in a fresh process.
+    Args:
+        args (tuple): (screen name, source directory, window size, rounds).
+    Returns:
+        dict: The screen, how many frames ran and the frames that differed.
+    """
+    name, source, size, rounds = args
+    sys.path.insert(0, source)
+    with tempfile.TemporaryDirectory(prefix='logic-quest-bench-') as scratch:
+        prepare_directory(source, scratch)
+        os.chdir(scratch)
+        scheduler, _ = _drive(name, size, rounds, trace=False, check=True)
+        os.chdir(source)
+    return {'screen': name, 'frames': len(scheduler.frame_times), 'mismatches': scheduler.mismatches}
+
+
+def _run_all(function, screens, source, size, rounds):
+    # A fresh process per screen, so one screen's caches and peak memory don't leak into the next,
+    # and a screen that crashes is reported instead of hanging the run
+    context = multiprocessing.get_context('spawn')
+    results = []
+    for name in screens:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            try:
+                results.append(executor.submit(function, (name, source, size, rounds)).result())
+            except concurrent.futures.process.BrokenProcessPool:
+                print(f"The {name} screen crashed", file=sys.stderr)
+                results.append({'screen': name, 'error': 'crashed'})
+    return results
+
+
+def check_redraw(screens, source, size, rounds):
+    failed = False
+    for result in _run_all(check_scenario, screens, source, size, rounds):
+        if 'error' in result:
+            print(f"{result['screen']:<12} {result['error']}")
+            failed = True
+            continue
+        mismatches = result['mismatches']
+        if mismatches:
+            failed = True
+            frames = ', '.join(f"{frame} ({pixels} px)" for frame, pixels in mismatches[:5])
+            more = f" and {len(mismatches) - 5} more" if len(mismatches) > 5 else ""
+            print(f"{result['screen']:<12} {len(mismatches)} of {result['frames']} frames differ from a full "
+                  f"redraw: {frames}{more}")
+        else:
+            print(f"{result['screen']:<12} all {result['frames']} frames match a full redraw")
+    return 1 if failed else 0
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Benchmark the game screens headlessly.")
+    parser.add_argument('screens', nargs='*', default=list(SCENES), help=f"screens to run: {', '.join(SCENES)}")
+    parser.add_argument('--rounds', type=int, default=DEFAULT_ROUNDS, help="scripted rounds per screen")
+    parser.add_argument('--size', default='x'.join(map(str, DEFAULT_SIZE)), help="window size, e.g. 1920x1080")
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help="where to write the JSON results")
+    parser.add_argument('--check-redraw', action='store_true',
+                        help="compare dirty-rectangle frames with full redraws instead of benchmarking")
+    args = parser.parse_args(argv)
+
+    for name in args.screens:
+        if name not in SCENES:
+            parser.error(f"unknown screen {name!r}; choose from {', '.join(SCENES)}")
+    size = tuple(int(v) for v in args.size.lower().split('x'))
+    source = os.path.dirname(os.path.abspath(__file__))
+    if args.check_redraw:
+        return check_redraw(args.screens, source, size, args.rounds)
+
+    results = _run_all(run_scenario, args.screens, source, size, args.rounds)
+
+    print(f"{'screen':<12} {'frames':>7} {'fps':>9} {'p50 ms':>8} {'p99 ms':>8} {'net blk/f':>9} "
+          f"{'KiB/f':>8} {'RSS MiB':>8}")
+    for result in results:
+        if 'error' in result:
+            print(f"{result['screen']:<12} {result['error']}")
+            continue
+        rss = f"{result['peak_rss_kib'] / 1024:.1f}" if result['peak_rss_kib'] else '-'
+        print(f"{result['screen']:<12} {result['frames']:>7} {result['fps']:>9,.0f} "
+              f"{result['frame_ms']['p50']:>8.3f} {result['frame_ms']['p99']:>8.3f} "
+              f"{result['net_blocks_per_frame']:>9.1f} {result['alloc_peak_kib_per_frame']:>8.1f} {rss:>8}")
+
+    report = {
+        'python': platform.python_version(),
+        'pygame': pygame.version.ver,
+        'platform': platform.platform(),
+        'size': list(size),
+        'rounds': args.rounds,
+        'results': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
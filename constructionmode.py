@@ -0,0 +1,328 @@
+"""
+Construction Mode for Logic Quest Game
+
+Instead of picking the answer from a list, students build it: the answer's
+symbols are dealt out as tiles, together with a couple of spare ones, and are
+dropped into a row of blanks, one symbol per blank. After every drop the
+blanks are checked from left to right and outlined green while they still
+start a well-formed formula and red where they stop doing so. Only the blanks
+from the changed one onwards are checked again (see logic.PrefixChecker).
+
+Once every blank is filled the formula is graded by its truth-table
+fingerprint, so any arrangement that means the same as the answer, such as
+"q<->p" for "p<->q", is accepted.
+
+Classes:
+    ConstructionScene: The scene running the construction mode interface.
+
+Methods:
+    deal_tiles(): Deals out the tiles and blanks for the current question.
+    drop(tile): Puts a dropped tile into the blank under it, or back in the tile bank.
+    grade(): Checks the blanks and updates the feedback.
+    clear(): Puts every tile back in the tile bank.
+    saveGame(): Saves the current question number for the current user.
+"""
+import random
+
+import pygame
+
+import assets
+import question_store
+import save_store
+import text_cache
+from grading import answer_key
+from hit_grid import HitGrid
+from layout import Layout, BOTTOM_LEFT, BOTTOM_RIGHT, CENTER
+from logic import LogicSyntaxError, PrefixChecker, parse, tokenize
+from pausemenu import PauseScene
+from question_generator import OPERATORS, VARIABLES
+from scene_manager import Scene, run
+from widgets import Button, DragDispatcher, DraggableItem, draw_outline, black, grey
+
+red = (255, 0, 0)
+green = (0, 160, 0)
+
+# The mode this scene's saves are kept under
+SAVE_MODE = 'construction'
+
+TOP_MARGIN = 50
+BOTTOM_MARGIN = 100
+LEFT_MARGIN = 50
+SLOT_WIDTH = 70
+SLOT_HEIGHT = 60
+SLOT_SPACING = 15
+TILE_WIDTH = 60
+TILE_HEIGHT = 50
+TILE_SPACING = 20
+# Spare tiles dealt out on top of the answer's own symbols
+SPARE_TILES = 2
+outline_thickness = 3
+
+SLOT_COLORS = {'empty': grey, 'ok': green, 'error': red, 'pending': black}
+
+
+def answer_tokens(question):
+    """
+    Returns:
+        list[str]: The symbols of a question's answer, one per blank, or None if it does not parse.
+    """
+    try:
+        formula = parse(question.answer.strip())
+    except LogicSyntaxError:
+        return None
+    return [token[1] for token in tokenize(str(formula))]
+
+
+class ConstructionScene(Scene):
+    caption = "Construction Mode"
+    tracks_dirty = True
+
+    def __init__(self, manager):
+        super().__init__(manager)
+        self.font = assets.get_font("arial", 45)
+        self.mediumfont = assets.get_font("arial", 50)
+        self.smallfont = assets.get_font("arial", 20)
+
+        self.feedback_text = ""
+        self.feedback_update = False
+
+        self.layout = Layout()
+        self.layout.add('slots', anchor=CENTER, offset=(0, -SLOT_HEIGHT // 2))
+        self.layout.add('tile_bank', anchor=BOTTOM_LEFT, offset=(0, -BOTTOM_MARGIN - 60))
+        self.layout.add('next_question', (160, 40), anchor=BOTTOM_RIGHT, offset=(-200, -60))
+        self.layout.add('clear', (160, 40), anchor=BOTTOM_RIGHT, offset=(-400, -60))
+
+        self.username = manager.username
+        self.saves = save_store.default_store()
+
+        self.bank = question_store.load()
+        self.current_question_index = 0
+        state = self.saves.load(self.username, SAVE_MODE)
+        if state is not None:
+            self.current_question_index = state.question_index % len(self.bank)
+        self.skip_unbuildable()
+
+        self.next_question_button = Button(grey, 0, 0, 160, 40, 'Next Question')
+        self.clear_button = Button(grey, 0, 0, 160, 40, 'Clear')
+
+        self.layout.resolve(self.size)
+        self.deal_tiles()
+        self.on_resize(*self.size)
+
+    @property
+    def question(self):
+        return self.bank[self.current_question_index]
+
+    def skip_unbuildable(self):
+        # Only questions whose answer parses can be built from tiles
+        for _ in range(len(self.bank)):
+            if answer_tokens(self.question):
+                return
+            self.current_question_index = (self.current_question_index + 1) % len(self.bank)
+
+    def on_resize(self, width, height):
+        self.layout.resolve((width, height))
+        self.BG = assets.get_background((width, height))
+        self.next_question_button.place(self.layout['next_question'])
+        self.clear_button.place(self.layout['clear'])
+        self.question_description_text = self.get_question_text()
+        self.place_slots()
+        self.place_tiles()
+
+    def is_active(self):
+        # Only dragging needs frames without input
+        return self.drag.dragged is not None
+
+    def get_question_text(self):
+        text = self.question.text
+        # Long questions get the smaller font so they fit across the window
+        font = self.mediumfont if self.mediumfont.size(text)[0] < self.manager.width - 2 * LEFT_MARGIN \
+            else self.smallfont
+        return font.render(text, True, black)
+
+    def get_question_number_text(self):
+        return self.font.render(f"Question Number: {self.current_question_index + 1}", True, black)
+
+    def deal_tiles(self):
+        """
+        Deals out a tile for each symbol of the answer plus a few spare ones, in a
+        shuffled order, and makes a blank for each symbol of the answer.
+        """
+        tokens = self.key_tokens = answer_tokens(self.question)
+        # The manager's seed keeps replays dealing the same tiles
+        seed = self.manager.seed
+        rng = random.Random(None if seed is None else f"{seed}-{self.question.number}")
+        spares = [rng.choice(VARIABLES if i % 2 == 0 else OPERATORS) for i in range(SPARE_TILES)]
+        symbols = tokens + spares
+        rng.shuffle(symbols)
+
+        self.key = answer_key(self.question)
+        self.checker = PrefixChecker(len(tokens))
+        # The last formula recorded in the answer history for this question
+        self.graded_text = None
+        self.tiles = [DraggableItem(symbol, 0, 0, TILE_WIDTH, TILE_HEIGHT, self.smallfont, False, (0, 0, 0, 0))
+                      for symbol in symbols]
+        self.in_slot = [None] * len(tokens)
+        self.slot_of = dict.fromkeys(self.tiles)
+        self.drag = DragDispatcher(self.tiles)
+        self.question_number_text = self.get_question_number_text()
+        self.place_slots()
+        self.place_tiles()
+
+    def place_slots(self):
+        count = len(self.in_slot)
+        row_width = count * SLOT_WIDTH + (count - 1) * SLOT_SPACING
+        left = self.layout['slots'].x - row_width // 2
+        top = self.layout['slots'].y
+        self.slots = [pygame.Rect(left + i * (SLOT_WIDTH + SLOT_SPACING), top, SLOT_WIDTH, SLOT_HEIGHT)
+                      for i in range(count)]
+        self.slot_grid = HitGrid()
+        for i, slot in enumerate(self.slots):
+            self.slot_grid.add(i, slot)
+        # The tiles drop onto the row of blanks
+        row = self.slots[0].unionall(self.slots[1:])
+        for tile in self.tiles:
+            tile.sol_box = tuple(row)
+            tile.drop_rect = row
+
+    def place_tiles(self):
+        # The tile bank is centred, wrapping onto more rows if the window is narrow
+        per_row = max(1, (self.manager.width - 2 * LEFT_MARGIN + TILE_SPACING) // (TILE_WIDTH + TILE_SPACING))
+        self.homes = {}
+        for i, tile in enumerate(self.tiles):
+            row, column = divmod(i, per_row)
+            in_row = min(per_row, len(self.tiles) - row * per_row)
+            left = (self.manager.width - (in_row * TILE_WIDTH + (in_row - 1) * TILE_SPACING)) // 2
+            self.homes[tile] = (left + column * (TILE_WIDTH + TILE_SPACING),
+                                self.layout['tile_bank'].y + row * (TILE_HEIGHT + TILE_SPACING))
+        for tile in self.tiles:
+            slot = self.slot_of[tile]
+            if slot is None:
+                tile.rect.topleft = self.homes[tile]
+            else:
+                tile.rect.center = self.slots[slot].center
+            self.drag.grid.move(tile, tile.rect)
+
+    def fill(self, slot, tile):
+        self.in_slot[slot] = tile
+        if tile is not None:
+            self.slot_of[tile] = slot
+            tile.rect.center = self.slots[slot].center
+            self.drag.grid.move(tile, tile.rect)
+        self.checker.set(slot, None if tile is None else tile.text)
+
+    def send_home(self, tile):
+        slot = self.slot_of[tile]
+        if slot is not None:
+            self.slot_of[tile] = None
+            self.fill(slot, None)
+        tile.rect.topleft = self.homes[tile]
+        self.drag.grid.move(tile, tile.rect)
+
+    def drop(self, tile):
+        """
+        Puts a dropped tile into the blank under its centre, sending a tile that was
+        already there back to the tile bank, or sends it back itself if it missed.
+        """
+        target = self.slot_grid.topmost(tile.rect.center)
+        if target is None:
+            self.send_home(tile)
+        else:
+            old = self.slot_of[tile]
+            if old is not None and old != target:
+                self.slot_of[tile] = None
+                self.fill(old, None)
+            occupant = self.in_slot[target]
+            if occupant is not None and occupant is not tile:
+                self.send_home(occupant)
+            self.fill(target, tile)
+        self.grade()
+        self.dirty.invalidate()
+
+    def grade(self):
+        if self.checker.complete():
+            text = self.checker.text()
+            correct = self.key.accepts(text)
+            self.feedback_text = "Correct" if correct else "Not equivalent"
+            self.feedback_update = correct
+            # Dropping a tile back where it was doesn't make a new answer
+            if text != self.graded_text:
+                self.graded_text = text
+                self.saves.record_answer(self.username, SAVE_MODE, self.current_question_index, text, correct)
+        elif None not in self.checker.tokens:
+            self.feedback_text = "Not a formula"
+            self.feedback_update = False
+        else:
+            self.feedback_text = ""
+            self.feedback_update = False
+
+    def clear(self):
+        for tile in self.tiles:
+            self.send_home(tile)
+        self.grade()
+        self.dirty.invalidate()
+
+    def pause_game(self):
+        self.manager.push(PauseScene(self.manager, on_save=self.saveGame))
+
+    def saveGame(self):
+        self.saves.save(self.username, SAVE_MODE, self.current_question_index)
+
+    def next_question(self):
+        self.current_question_index = (self.current_question_index + 1) % len(self.bank)
+        self.skip_unbuildable()
+        self.question_description_text = self.get_question_text()
+        self.deal_tiles()
+        self.feedback_text = ""
+        self.feedback_update = False
+        self.saveGame()
+        self.dirty.invalidate()
+
+    def handle_event(self, event):
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_p:  # Open the pause menu
+                self.pause_game()
+                return
+            if event.key == pygame.K_ESCAPE:
+                self.manager.pop()
+                return
+
+        dropped = self.drag.handle_event(event, self.dirty)
+        if dropped is not None:
+            self.drop(dropped)
+
+        if event.type == pygame.MOUSEBUTTONDOWN and self.drag.dragged is None:
+            if self.next_question_button.is_over(event.pos) and self.feedback_update:
+                self.next_question()
+            elif self.clear_button.is_over(event.pos):
+                self.clear()
+
+    def draw(self, win):
+        WIDTH = self.manager.width
+
+        win.blit(self.BG, (0, 0))
+        win.blit(self.question_number_text, (LEFT_MARGIN, TOP_MARGIN))
+        win.blit(self.question_description_text,
+                 ((WIDTH - self.question_description_text.get_width()) // 2, TOP_MARGIN + 100))
+        text = text_cache.render(assets.get_font(None, 32), 'P to pause', black)
+        win.blit(text, (WIDTH - text.get_width() - 10, 10))
+        self.next_question_button.draw(win, black)
+        self.clear_button.draw(win, black)
+
+        for i, slot in enumerate(self.slots):
+            draw_outline(win, SLOT_COLORS[self.checker.status(i)], slot, outline_thickness)
+        for tile in self.tiles:
+            tile.draw(win)
+
+        if self.feedback_text:
+            color = green if self.feedback_update else red
+            message = text_cache.render(assets.get_font(None, 45, True), self.feedback_text, color)
+            win.blit(message, ((WIDTH - message.get_width()) // 2, self.slots[0].bottom + 30))
+
+
+def main():
+    run(ConstructionScene)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Dirty rectangle tracking.
+
+Scenes that track dirty rectangles mark only the areas that changed since the
+last frame (a dragged item, the timer text, the feedback message). The scene
+manager then redraws the scene clipped to those areas and pushes only them to
+the display, instead of blitting and updating the whole window every frame.
+
+Classes:
+    DirtyRegion: The areas of the window that need redrawing.
+"""
+import pygame
+
+# Past this many separate areas it is cheaper to update their bounding box
+MAX_RECTS = 8
+
+
+class DirtyRegion:
+    """
+    The areas of the window that need redrawing. A new region starts out fully
+    dirty, so the first frame of a scene is always drawn completely.
+
+    Methods:
+        add(rect): Marks an area as dirty.
+        invalidate(): Marks the whole window as dirty.
+        flush(): Returns the dirty areas and resets the region.
+    """
+    def __init__(self):
+        self.full = True
+        self.rects = []
+
+    def add(self, rect):
+        if not self.full:
+            rect = pygame.Rect(rect)
+            if rect.width > 0 and rect.height > 0:
+                self.rects.append(rect)
+
+    def invalidate(self):
+        self.full = True
+        self.rects = []
+
+    def flush(self):
+        """
+        Returns the dirty areas and resets the region to clean.
+        Returns:
+            list[pygame.Rect]: The merged dirty areas, or None if the whole window is dirty.
+        """
+        if self.full:
+            self.full = False
+            return None
+        rects = self.rects
+        self.rects = []
+
+        # Merge overlapping areas so nothing is drawn twice
+        merged = []
+        for rect in rects:
+            index = rect.collidelist(merged)
+            while index != -1:
+                rect = rect.union(merged.pop(index))
+                index = rect.collidelist(merged)
+            merged.append(rect)
+        if len(merged) > MAX_RECTS:
+            merged = [merged[0].unionall(merged[1:])]
+        return merged
@@ -0,0 +1,82 @@
+"""
+Idle-aware frame scheduler.
+
+While nothing is moving, the scene manager does not need to spin at a fixed
+frame rate. When the scene on top is static, the scheduler blocks on
+pygame.event.wait until input arrives (or a timeout passes, so the scene still
+gets the odd update). While the scene is active, for example while an item is
+being dragged or a timer is running, it runs at the scene's full frame rate.
+
+Classes:
+    FrameScheduler: Decides how long to wait between frames and collects the events.
+"""
+import time
+from collections import deque
+
+import pygame
+
+# How long a static scene sleeps when no input arrives, in milliseconds
+IDLE_TIMEOUT = 500
+# How many recent frames the statistics are taken over
+STATS_WINDOW = 120
+
+
+class FrameScheduler:
+    """
+    Waits between frames and returns the events that arrived meanwhile.
+
+    Attributes:
+        idle_timeout (int): The longest a static scene sleeps without input, in milliseconds.
+        clock (pygame.time.Clock): Caps the frame rate.
+
+    Methods:
+        next_events(fps, active): Waits for the next frame and returns its events.
+        stats(): Frame time and idle share over the recent frames.
+    """
+    def __init__(self, idle_timeout=IDLE_TIMEOUT):
+        self.idle_timeout = idle_timeout
+        self.clock = pygame.time.Clock()
+        self._frames = deque(maxlen=STATS_WINDOW)
+        self._frame_start = time.perf_counter()
+
+    def next_events(self, fps, active):
+        """
+        Waits until the next frame is due and returns the events to handle in it.
+        Args:
+            fps (int): The frame rate cap.
+            active (bool): Whether the scene is animating; static scenes sleep until input arrives.
+        Returns:
+            list[pygame.event.Event]: The events that arrived since the last frame.
+        """
+        now = time.perf_counter()
+        busy = now - self._frame_start
+
+        events = []
+        if not active and not pygame.event.peek():
+            event = pygame.event.wait(self.idle_timeout)
+            if event.type != pygame.NOEVENT:
+                events.append(event)
+        # Still cap the frame rate, e.g. while the mouse moves over a static scene
+        self.clock.tick(fps)
+        events.extend(pygame.event.get())
+
+        self._frame_start = time.perf_counter()
+        self._frames.append((busy, self._frame_start - now))
+        return events
+
+    def stats(self):
+        """
+        Returns:
+            dict: 'frame_ms', the average time spent working on a frame, 'fps', the
+            frames per second, and 'idle_share', the fraction of time spent waiting.
+        """
+        if not self._frames:
+            return {'frame_ms': 0.0, 'fps': 0.0, 'idle_share': 0.0}
+        busy = sum(frame[0] for frame in self._frames)
+        idle = sum(frame[1] for frame in self._frames)
+        total = busy + idle
+        return {
+            'frame_ms': busy / len(self._frames) * 1000,
+            'fps': len(self._frames) / total if total else 0.0,
+            'idle_share': idle / total if total else 0.0,
+        }
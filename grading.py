@@ -0,0 +1,112 @@
+"""
+Semantic grading of answers.
+
+Each formula is reduced to a truth-table fingerprint: an integer whose bit r is
+the formula's value on row r of the truth table over the question's variables
+(see truth_table.py for the row order). Two formulas are logically equivalent
+exactly when their fingerprints are equal, so "s<->q" is accepted for an answer
+of "q<->s" and checking a dropped option is a single integer compare.
+
+Classes:
+    AnswerKey: The fingerprint of a question's answer and its options.
+
+Functions:
+    fingerprint(formula, variables): A formula's truth-table fingerprint.
+    answer_key(question): The cached AnswerKey of a question.
+"""
+from functools import lru_cache
+
+from logic import LogicSyntaxError, parse
+from truth_table import equivalent, packed_truth_table
+
+
+def fingerprint(formula, variables=None):
+    """
+    Returns a formula's truth-table fingerprint.
+    Args:
+        formula (Formula or str): The formula.
+        variables (tuple): The variable order; defaults to the formula's variables sorted by name.
+    Returns:
+        int: Bit r is the formula's value on row r.
+    """
+    words = packed_truth_table(formula, variables).tolist()
+    value = 0
+    for i, word in enumerate(words):
+        value |= word << (64 * i)
+    return value
+
+
+class AnswerKey:
+    """
+    The fingerprint of a question's answer, plus the fingerprints of its options.
+    All fingerprints use the same variables: every variable in the answer or options.
+
+    Attributes:
+        answer (str): The answer as written in answers.txt.
+        formula (Formula): The parsed answer, or None if it does not parse.
+        variables (tuple): The variables the fingerprints are taken over.
+        fingerprint (int): The answer's fingerprint.
+
+    Methods:
+        accepts(text): Checks whether an answer is equivalent to the correct one.
+    """
+    def __init__(self, answer, options=()):
+        self.answer = answer
+        self._accepted = {}
+        try:
+            self.formula = parse(answer)
+        except LogicSyntaxError:
+            # Fall back to comparing text so a typo in answers.txt does not break the question
+            self.formula = None
+            self.variables = ()
+            self.fingerprint = None
+            return
+
+        variables = set(self.formula.variables)
+        for option in options:
+            try:
+                variables |= parse(option).variables
+            except LogicSyntaxError:
+                pass
+        self.variables = tuple(sorted(variables))
+        self.fingerprint = fingerprint(self.formula, self.variables)
+        for option in options:
+            self.accepts(option)
+
+    def accepts(self, text):
+        """
+        Checks whether an answer is logically equivalent to the correct one.
+        Args:
+            text (str): The answer to check, e.g. a dropped option or a typed answer.
+        Returns:
+            bool: True if the answer is correct.
+        """
+        accepted = self._accepted.get(text)
+        if accepted is None:
+            accepted = self._check(text)
+            self._accepted[text] = accepted
+        return accepted
+
+    def _check(self, text):
+        if self.formula is None:
+            return text.strip() == self.answer.strip()
+        try:
+            formula = parse(text.strip())
+        except LogicSyntaxError:
+            return False
+        if formula.variables <= set(self.variables):
+            return fingerprint(formula, self.variables) == self.fingerprint
+        # Free-form answers may mention variables the options do not
+        return equivalent(formula, self.formula)
+
+
+@lru_cache(maxsize=1024)
+def answer_key(question):
+    """
+    Returns the answer key of a question, built once per question.
+    Args:
+        question (Question): The question, as returned by QuestionBank.
+    Returns:
+        AnswerKey: The question's answer key.
+    """
+    return AnswerKey(question.answer, question.options)
@@ -0,0 +1,107 @@
+"""
+Spatial index for hit-testing widgets.
+
+Scenes used to ask every widget whether the mouse was over it on every event.
+A HitGrid splits the window into square cells and remembers which widgets
+overlap each cell, so finding the widgets under the cursor only looks at the
+few that share its cell, however many answer tiles and buttons a screen has.
+
+Widgets added later are on top of earlier ones, matching the order scenes draw
+them in.
+
+Classes:
+    HitGrid: A uniform grid of widget rectangles.
+"""
+from collections import defaultdict
+
+import pygame
+
+# The side of a grid cell in pixels; about the size of an answer tile
+CELL_SIZE = 100
+
+
+class HitGrid:
+    """
+    A uniform grid of widget rectangles.
+
+    Methods:
+        add(widget, rect): Puts a widget on top of the others.
+        move(widget, rect): Updates where a widget is, keeping its place in the order.
+        remove(widget): Takes a widget out.
+        at(pos): The widgets under a point, topmost first.
+        topmost(pos): The topmost widget under a point.
+    """
+    def __init__(self, cell_size=CELL_SIZE):
+        self.cell_size = cell_size
+        self._cells = defaultdict(list)
+        # widget: (order, rect, cells)
+        self._entries = {}
+        self._next_order = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, widget):
+        return widget in self._entries
+
+    def _cells_for(self, rect):
+        size = self.cell_size
+        return [(column, row)
+                for column in range(rect.left // size, (rect.right - 1) // size + 1)
+                for row in range(rect.top // size, (rect.bottom - 1) // size + 1)]
+
+    def _insert(self, widget, rect, order):
+        # Widgets move their rects in place, so the grid keeps its own copy
+        rect = pygame.Rect(rect)
+        cells = self._cells_for(rect)
+        for cell in cells:
+            self._cells[cell].append(widget)
+        self._entries[widget] = (order, rect, cells)
+
+    def add(self, widget, rect):
+        """
+        Puts a widget on top of the others.
+        Args:
+            widget: Any hashable object.
+            rect (pygame.Rect or tuple): The area the widget covers.
+        """
+        self.remove(widget)
+        self._insert(widget, rect, self._next_order)
+        self._next_order += 1
+
+    def move(self, widget, rect):
+        order = self._entries[widget][0]
+        self.remove(widget)
+        self._insert(widget, rect, order)
+
+    def remove(self, widget):
+        entry = self._entries.pop(widget, None)
+        if entry is None:
+            return
+        for cell in entry[2]:
+            widgets = self._cells[cell]
+            widgets.remove(widget)
+            if not widgets:
+                del self._cells[cell]
+
+    def clear(self):
+        self._cells.clear()
+        self._entries.clear()
+
+    def at(self, pos):
+        """
+        Returns:
+            list: The widgets whose area contains the point, topmost first.
+        """
+        cell = (int(pos[0]) // self.cell_size, int(pos[1]) // self.cell_size)
+        hits = [widget for widget in self._cells.get(cell, ()) if self._entries[widget][1].collidepoint(pos)]
+        hits.sort(key=lambda widget: self._entries[widget][0], reverse=True)
+        return hits
+
+    def topmost(self, pos):
+        """
+        Returns:
+            The topmost widget under the point, or None.
+        """
+        hits = self.at(pos)
+        return hits[0] if hits else None
@@ -0,0 +1,86 @@
+"""
+Landing Page for Logic Quest Game
+
+The main menu shown after logging in. Each button pushes the chosen mode on the
+scene stack, and the modes come back here when they exit.
+
+Classes:
+    LandingScene: The main menu scene.
+"""
+import pygame
+
+import assets
+from hit_grid import HitGrid
+from instructorMode import InstructorScene
+from layout import Layout, CENTER, TOP
+from constructionmode import ConstructionScene
+from Leaderboard import LeaderboardScene
+from lightningmode import LightningScene
+from scene_manager import Scene, run
+from trainingmode import TrainingScene
+from widgets import Button, black, grey
+
+
+class LandingScene(Scene):
+    caption = "Logic Quest"
+
+    def __init__(self, manager):
+        super().__init__(manager)
+        self.title = assets.get_font("arial", 80).render("LOGIC QUEST", True, black)
+
+        labels = ['Training Mode', 'Lightning Mode', 'Construction Mode', 'Leaderboard']
+        if manager.is_instructor:
+            labels.append('Instructor Mode')
+        labels.append('Quit')
+
+        # The buttons are a column centred in the window
+        button_width, button_height, spacing = 300, 55, 20
+        start_y = -(len(labels) * (button_height + spacing)) / 2
+        self.layout = Layout()
+        for i, label in enumerate(labels):
+            self.layout.add(label, (button_width, button_height), anchor=CENTER,
+                            offset=(0, start_y + i * (button_height + spacing)), pivot=TOP)
+        self.buttons = [Button(grey, 0, 0, button_width, button_height, label) for label in labels]
+        self.on_resize(*self.size)
+
+    def on_resize(self, width, height):
+        self.layout.resolve((width, height))
+        self.BG = assets.get_background((width, height))
+        self.button_grid = HitGrid()
+        for button in self.buttons:
+            button.place(self.layout[button.text])
+            self.button_grid.add(button, button.rect)
+
+    def open(self, label):
+        if label == 'Training Mode':
+            self.manager.push(TrainingScene(self.manager))
+        elif label == 'Lightning Mode':
+            self.manager.push(LightningScene(self.manager))
+        elif label == 'Construction Mode':
+            self.manager.push(ConstructionScene(self.manager))
+        elif label == 'Leaderboard':
+            self.manager.push(LeaderboardScene(self.manager))
+        elif label == 'Instructor Mode':
+            self.manager.push(InstructorScene(self.manager))
+        elif label == 'Quit':
+            self.manager.quit()
+
+    def handle_event(self, event):
+        if event.type == pygame.MOUSEBUTTONDOWN:
+            button = self.button_grid.topmost(event.pos)
+            if button is not None:
+                self.open(button.text)
+
+    def draw(self, win):
+        win.blit(self.BG, (0, 0))
+        win.blit(self.title, (self.manager.width / 2 - self.title.get_width() / 2, 100))
+        for button in self.buttons:
+            button.draw(win, black)
+
+
+def main():
+    run(LandingScene)
+
+
+if __name__ == "__main__":
+    main()
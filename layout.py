@@ -0,0 +1,92 @@
+"""
+Resolution-aware layout.
+
+Scenes declare where their widgets go relative to the window instead of in
+fixed pixels: an anchor point on the window (a fraction of its width and
+height), an offset in pixels from that point, and which point of the widget
+sits there. The layout turns these into rectangles once per window size and
+keeps them until the size changes, so nothing is recomputed while drawing.
+
+Constants:
+    TOP_LEFT, TOP, TOP_RIGHT, LEFT, CENTER, RIGHT, BOTTOM_LEFT, BOTTOM,
+    BOTTOM_RIGHT: Anchor points, as fractions of the width and height.
+
+Classes:
+    Layout: A set of named, anchored rectangles.
+
+Functions:
+    place(window_size, size, anchor, offset, pivot): Places one rectangle.
+"""
+import pygame
+
+TOP_LEFT = (0.0, 0.0)
+TOP = (0.5, 0.0)
+TOP_RIGHT = (1.0, 0.0)
+LEFT = (0.0, 0.5)
+CENTER = (0.5, 0.5)
+RIGHT = (1.0, 0.5)
+BOTTOM_LEFT = (0.0, 1.0)
+BOTTOM = (0.5, 1.0)
+BOTTOM_RIGHT = (1.0, 1.0)
+
+
+def place(window_size, size=(0, 0), anchor=TOP_LEFT, offset=(0, 0), pivot=TOP_LEFT):
+    """
+    Places a rectangle relative to the window.
+    Args:
+        window_size (tuple): The (width, height) of the window.
+        size (tuple): The (width, height) of the rectangle.
+        anchor (tuple): The point of the window to place it against, as fractions of its size.
+        offset (tuple): How far from the anchor point to place it, in pixels.
+        pivot (tuple): The point of the rectangle that goes there, as fractions of its size.
+    Returns:
+        pygame.Rect: The placed rectangle.
+    """
+    x = window_size[0] * anchor[0] + offset[0] - size[0] * pivot[0]
+    y = window_size[1] * anchor[1] + offset[1] - size[1] * pivot[1]
+    return pygame.Rect(int(x), int(y), size[0], size[1])
+
+
+class Layout:
+    """
+    A set of named rectangles placed relative to the window.
+
+    Attributes:
+        window_size (tuple): The window size the rectangles were last placed for.
+
+    Methods:
+        add(name, size, anchor, offset, pivot): Declares a rectangle.
+        resolve(window_size): Places every rectangle for a window size.
+        __getitem__(name): The placed rectangle.
+    """
+    def __init__(self):
+        self._specs = {}
+        self._rects = {}
+        self.window_size = None
+
+    def add(self, name, size=(0, 0), anchor=TOP_LEFT, offset=(0, 0), pivot=TOP_LEFT):
+        """
+        Declares a rectangle; see place() for the arguments. Returns the layout so
+        declarations can be chained.
+        """
+        self._specs[name] = (size, anchor, offset, pivot)
+        self.window_size = None
+        return self
+
+    def resolve(self, window_size):
+        """
+        Places every rectangle for the window size, unless they already are.
+        Args:
+            window_size (tuple): The (width, height) of the window.
+        Returns:
+            bool: True if the rectangles were placed again.
+        """
+        window_size = tuple(window_size)
+        if window_size == self.window_size:
+            return False
+        self._rects = {name: place(window_size, *spec) for name, spec in self._specs.items()}
+        self.window_size = window_size
+        return True
+
+    def __getitem__(self, name):
+        return self._rects[name]
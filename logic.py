@@ -0,0 +1,430 @@
+"""
+Propositional logic engine for the answer notation.
+
+Answers and options are written in a small infix language:
+
+    p, q, r, s      variables (any lower case letter except v, optionally followed by digits)
+    ~ or !          negation
+    ^               and
+    v               or
+    ->              implies (right associative)
+    <->             if and only if
+
+Negation binds tightest, then ^, v, -> and finally <->, so "q<->pvs" reads as
+"q<->(pvs)" and "rvs->q" reads as "(rvs)->q". Parentheses group as usual.
+
+Formulas are parsed into an AST whose nodes are interned: building the same
+formula twice gives back the very same node object, so identical formulas can be
+compared with "is" and used as cheap dictionary keys.
+
+Classes:
+    Formula: Base class of the AST nodes.
+    Var, Not, BinOp: The AST nodes.
+    LogicSyntaxError: Raised when a formula cannot be tokenized or parsed.
+    PrefixChecker: Checks a formula being built token by token, re-checking only what changed.
+
+Functions:
+    tokenize(text): Splits a formula into tokens.
+    parse(text): Parses a formula into an interned AST.
+    compile_formula(formula, variables): Compiles a formula into a Python function.
+"""
+from functools import lru_cache
+
+AND = '^'
+OR = 'v'
+IMPLIES = '->'
+IFF = '<->'
+NOT = '~'
+
+# Binding strength of each binary operator, higher binds tighter
+PRECEDENCE = {AND: 4, OR: 3, IMPLIES: 2, IFF: 1}
+RIGHT_ASSOCIATIVE = {IMPLIES}
+
+# Python code for each operator, used by compile_formula
+_PYTHON_OPS = {
+    AND: '({} and {})',
+    OR: '({} or {})',
+    IMPLIES: '(not {} or {})',
+    IFF: '({} == {})',
+}
+
+
+class LogicSyntaxError(ValueError):
+    """
+    Raised when a formula cannot be tokenized or parsed.
+
+    Attributes:
+        text (str): The formula.
+        position (int): The index in text where the problem was found.
+    """
+    def __init__(self, message, text, position):
+        super().__init__(f"{message} at position {position} in {text!r}")
+        self.text = text
+        self.position = position
+
+
+_interned = {}
+
+
+class Formula:
+    """
+    Base class of the AST nodes. Nodes are immutable and interned.
+
+    Attributes:
+        variables (frozenset): The names of the variables used in the formula.
+    """
+    __slots__ = ('variables',)
+
+    def evaluate(self, assignment):
+        """
+        Evaluates the formula.
+        Args:
+            assignment (dict): Maps each variable name to True or False.
+        Returns:
+            bool: The truth value of the formula.
+        """
+        raise NotImplementedError
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} nodes are immutable")
+
+    def __repr__(self):
+        return f"{type(self).__name__}({str(self)!r})"
+
+
+class Var(Formula):
+    __slots__ = ('name',)
+
+    def __new__(cls, name):
+        key = ('var', name)
+        node = _interned.get(key)
+        if node is None:
+            node = object.__new__(cls)
+            object.__setattr__(node, 'name', name)
+            object.__setattr__(node, 'variables', frozenset((name,)))
+            _interned[key] = node
+        return node
+
+    def evaluate(self, assignment):
+        return assignment[self.name]
+
+    def __str__(self):
+        return self.name
+
+
+class Not(Formula):
+    __slots__ = ('operand',)
+
+    def __new__(cls, operand):
+        key = (NOT, operand)
+        node = _interned.get(key)
+        if node is None:
+            node = object.__new__(cls)
+            object.__setattr__(node, 'operand', operand)
+            object.__setattr__(node, 'variables', operand.variables)
+            _interned[key] = node
+        return node
+
+    def evaluate(self, assignment):
+        return not self.operand.evaluate(assignment)
+
+    def __str__(self):
+        if isinstance(self.operand, BinOp):
+            return f"{NOT}({self.operand})"
+        return f"{NOT}{self.operand}"
+
+
+class BinOp(Formula):
+    __slots__ = ('op', 'left', 'right')
+
+    def __new__(cls, op, left, right):
+        if op not in PRECEDENCE:
+            raise ValueError(f"unknown operator {op!r}")
+        key = (op, left, right)
+        node = _interned.get(key)
+        if node is None:
+            node = object.__new__(cls)
+            object.__setattr__(node, 'op', op)
+            object.__setattr__(node, 'left', left)
+            object.__setattr__(node, 'right', right)
+            object.__setattr__(node, 'variables', left.variables | right.variables)
+            _interned[key] = node
+        return node
+
+    def evaluate(self, assignment):
+        left = self.left.evaluate(assignment)
+        right = self.right.evaluate(assignment)
+        if self.op == AND:
+            return left and right
+        if self.op == OR:
+            return left or right
+        if self.op == IMPLIES:
+            return not left or right
+        return left == right
+
+    def __str__(self):
+        precedence = PRECEDENCE[self.op]
+        left, right = str(self.left), str(self.right)
+        # Only add the brackets the precedence rules actually need
+        if isinstance(self.left, BinOp):
+            left_precedence = PRECEDENCE[self.left.op]
+            if left_precedence < precedence or (left_precedence == precedence and self.op in RIGHT_ASSOCIATIVE):
+                left = f"({left})"
+        if isinstance(self.right, BinOp):
+            right_precedence = PRECEDENCE[self.right.op]
+            if right_precedence < precedence or (right_precedence == precedence and self.op not in RIGHT_ASSOCIATIVE):
+                right = f"({right})"
+        return f"{left}{self.op}{right}"
+
+
+def tokenize(text):
+    """
+    Splits a formula into tokens.
+    Args:
+        text (str): The formula, e.g. "q<->pvs".
+    Returns:
+        list[tuple]: (kind, value, position) tuples, where kind is 'var', 'op', 'not', '(' or ')'.
+    Raises:
+        LogicSyntaxError: If the formula contains an unknown character.
+    """
+    tokens = []
+    i = 0
+    length = len(text)
+    while i < length:
+        char = text[i]
+        if char.isspace():
+            i += 1
+        elif text.startswith(IFF, i):
+            tokens.append(('op', IFF, i))
+            i += 3
+        elif text.startswith(IMPLIES, i):
+            tokens.append(('op', IMPLIES, i))
+            i += 2
+        elif char == AND or char == OR:
+            tokens.append(('op', char, i))
+            i += 1
+        elif char in '~!¬':
+            tokens.append(('not', NOT, i))
+            i += 1
+        elif char in '()':
+            tokens.append((char, char, i))
+            i += 1
+        elif 'a' <= char <= 'z':
+            start = i
+            i += 1
+            while i < length and text[i].isdigit():
+                i += 1
+            tokens.append(('var', text[start:i], start))
+        else:
+            raise LogicSyntaxError(f"unexpected character {char!r}", text, i)
+    return tokens
+
+
+class _Parser:
+    """Precedence climbing parser over the output of tokenize."""
+
+    def __init__(self, text):
+        self.text = text
+        self.tokens = tokenize(text)
+        self.index = 0
+
+    def peek(self):
+        if self.index < len(self.tokens):
+            return self.tokens[self.index]
+        return None
+
+    def error(self, message):
+        token = self.peek()
+        position = token[2] if token else len(self.text)
+        return LogicSyntaxError(message, self.text, position)
+
+    def parse(self):
+        if not self.tokens:
+            raise self.error("empty formula")
+        formula = self.parse_binary(1)
+        if self.peek() is not None:
+            raise self.error(f"unexpected {self.peek()[1]!r}")
+        return formula
+
+    def parse_binary(self, min_precedence):
+        left = self.parse_unary()
+        while True:
+            token = self.peek()
+            if token is None or token[0] != 'op' or PRECEDENCE[token[1]] < min_precedence:
+                return left
+            op = token[1]
+            self.index += 1
+            next_precedence = PRECEDENCE[op] if op in RIGHT_ASSOCIATIVE else PRECEDENCE[op] + 1
+            right = self.parse_binary(next_precedence)
+            left = BinOp(op, left, right)
+
+    def parse_unary(self):
+        token = self.peek()
+        if token is None:
+            raise self.error("formula ends early")
+        kind = token[0]
+        if kind == 'not':
+            self.index += 1
+            return Not(self.parse_unary())
+        if kind == 'var':
+            self.index += 1
+            return Var(token[1])
+        if kind == '(':
+            self.index += 1
+            formula = self.parse_binary(1)
+            if self.peek() is None or self.peek()[0] != ')':
+                raise self.error("missing ')'")
+            self.index += 1
+            return formula
+        raise self.error(f"unexpected {token[1]!r}")
+
+
+@lru_cache(maxsize=4096)
+def parse(text):
+    """
+    Parses a formula into an interned AST.
+    Args:
+        text (str): The formula, e.g. "(q->p)<->s".
+    Returns:
+        Formula: The root node of the formula.
+    Raises:
+        LogicSyntaxError: If the formula is not well formed.
+    """
+    return _Parser(text).parse()
+
+
+# Where a well-formed formula can be after a prefix of its tokens:
+# (whether an operand comes next, how many parentheses are open)
+_START = (True, 0)
+
+
+def _token_kind(token):
+    tokens = tokenize(token)
+    if len(tokens) != 1:
+        raise LogicSyntaxError("expected a single token", token, 0)
+    return tokens[0][0]
+
+
+def _advance(state, kind):
+    # The state after one more token, or None if no formula continues this way
+    wants_operand, depth = state
+    if wants_operand:
+        if kind == 'var':
+            return False, depth
+        if kind == 'not':
+            return True, depth
+        if kind == '(':
+            return True, depth + 1
+    else:
+        if kind == 'op':
+            return True, depth
+        if kind == ')' and depth > 0:
+            return False, depth - 1
+    return None
+
+
+class PrefixChecker:
+    """
+    Checks a formula that is being built one token per slot, e.g. by dropping
+    tiles into blanks, from left to right. Each slot keeps the parser state
+    after it, so changing one slot only re-checks from that slot up to the
+    first later slot whose state comes out the same as before.
+
+    Slots are filled in any order; everything after the first empty slot is
+    pending until the gap is filled.
+
+    Attributes:
+        tokens (list[str]): The token in each slot, or None while it is empty.
+
+    Methods:
+        set(index, token): Fills or empties a slot.
+        status(index): Whether a slot is 'empty', 'ok', 'error' or 'pending'.
+        valid_prefix(): How many slots from the left form the start of a formula.
+        complete(): Whether every slot is filled and together they form a formula.
+        text(): The slots joined into a formula string.
+    """
+    def __init__(self, size):
+        self.tokens = [None] * size
+        self._kinds = [None] * size
+        self._states = [None] * size
+        # How many slots were re-checked by the last set(), for profiling
+        self.last_checked = 0
+
+    def __len__(self):
+        return len(self.tokens)
+
+    def _before(self, index):
+        return _START if index == 0 else self._states[index - 1]
+
+    def set(self, index, token):
+        """
+        Fills a slot with a token, or empties it, and re-checks the slots it affects.
+        Args:
+            index (int): The slot.
+            token (str): A single token such as "p", "^", "->", "~" or "(", or None to empty the slot.
+        Raises:
+            LogicSyntaxError: If the token is not a single token.
+        """
+        self.tokens[index] = token
+        self._kinds[index] = None if token is None else _token_kind(token)
+        checked = 0
+        for i in range(index, len(self.tokens)):
+            before = self._before(i)
+            kind = self._kinds[i]
+            state = None if before is None or kind is None else _advance(before, kind)
+            checked += 1
+            if i > index and state == self._states[i]:
+                # Everything from here on comes out as it did before
+                break
+            self._states[i] = state
+        self.last_checked = checked
+
+    def status(self, index):
+        if self.tokens[index] is None:
+            return 'empty'
+        if self._before(index) is None:
+            return 'pending'
+        return 'ok' if self._states[index] is not None else 'error'
+
+    def valid_prefix(self):
+        count = 0
+        for state in self._states:
+            if state is None:
+                break
+            count += 1
+        return count
+
+    def complete(self):
+        return bool(self.tokens) and self._states[-1] == (False, 0)
+
+    def text(self):
+        return ''.join(token for token in self.tokens if token is not None)
+
+
+def _python_source(formula, names):
+    if isinstance(formula, Var):
+        return names[formula.name]
+    if isinstance(formula, Not):
+        return f"(not {_python_source(formula.operand, names)})"
+    return _PYTHON_OPS[formula.op].format(_python_source(formula.left, names), _python_source(formula.right, names))
+
+
+@lru_cache(maxsize=4096)
+def compile_formula(formula, variables=None):
+    """
+    Compiles a formula into a plain Python function, which is much faster than
+    Formula.evaluate when the same formula is evaluated many times.
+    Args:
+        formula (Formula): The formula to compile.
+        variables (tuple): The argument order; defaults to the formula's variables sorted by name.
+    Returns:
+        function: Takes one bool per variable, in order, and returns the formula's value.
+    """
+    if variables is None:
+        variables = tuple(sorted(formula.variables))
+    names = {name: f"_{i}" for i, name in enumerate(variables)}
+    missing = formula.variables - set(variables)
+    if missing:
+        raise ValueError(f"no argument for variables {sorted(missing)}")
+    source = f"lambda {', '.join(names[name] for name in variables)}: {_python_source(formula, names)}"
+    return eval(source, {})
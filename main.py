@@ -0,0 +1,11 @@
+"""
+Entry point for Logic Quest.
+
+Starts the game on the login page. Every other screen is reached from there
+inside the same window; see scene_manager.py.
+"""
+from scene_manager import run
+from Sign_in import LoginScene
+
+if __name__ == "__main__":
+    run(LoginScene)
@@ -0,0 +1,236 @@
+"""
+Persistence layer shared by every file the game writes.
+
+Several copies of the game can run at once against the same files, for example
+a lab of machines sharing a network home directory. To keep them from
+corrupting each other's saves:
+
+- A file is never rewritten in place. The new contents go to a temporary file
+  in the same directory which then replaces the old one in a single rename, so
+  readers always see either the old or the new file, never half of one.
+- Read-modify-write updates and appends hold an advisory lock on a small
+  sidecar lock file for just that one file, so two clients cannot lose each
+  other's updates, and clients saving different files never wait on each other.
+- Writes are not fsynced one by one. Files written since the last sync are
+  synced together once the oldest of them has waited SYNC_INTERVAL seconds,
+  which the scene manager checks every frame, and when the game exits, so a
+  crash can lose the last moment of saves but saving stays cheap.
+
+SQLite databases lock themselves; connect() opens them with a busy timeout so
+clients wait for each other's writes instead of failing.
+
+Functions:
+    locked(path): Holds the advisory lock for a file.
+    read_text(path): Reads a text file, or a default if it does not exist.
+    atomic_write(path, data): Replaces a file's contents in one rename.
+    update(path, change): Locked read-modify-write of a text file.
+    append(path, text): Locked append to a text file.
+    sync_due(): Syncs the files written since the last sync once they have waited long enough.
+    sync_pending(): Syncs every file written since the last sync.
+    connect(path): Opens an SQLite database for concurrent use.
+"""
+import atexit
+import os
+import sqlite3
+import tempfile
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# How long a written file waits to be synced with the others, in seconds. It is
+# synced on the first sync_due() call after that, i.e. within a frame or an idle timeout
+SYNC_INTERVAL = 2.0
+# How long an SQLite client waits for another client's write to finish, in seconds
+BUSY_TIMEOUT = 10
+# How long msvcrt waits between attempts to take a lock, in seconds
+LOCK_RETRY = 0.05
+
+_pending = set()
+# When the oldest file in _pending was written
+_pending_since = None
+
+
+@contextmanager
+def locked(path):
+    """
+    Holds an exclusive advisory lock for a file while the block runs. The lock is
+    taken on path + '.lock' rather than the file itself, because the file is
+    replaced by a new one on every write.
+    Args:
+        path (str): The file to lock.
+    """
+    with open(path + '.lock', 'a+b') as lock_file:
+        fd = lock_file.fileno()
+        if fcntl is not None:
+            # lockf locks also hold across NFS, unlike flock on some systems
+            fcntl.lockf(fd, fcntl.LOCK_EX)
+        else:
+            lock_file.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+                    break
+                except OSError:
+                    time.sleep(LOCK_RETRY)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.lockf(fd, fcntl.LOCK_UN)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+
+def read_text(path, default=''):
+    """
+    Returns:
+        str: The contents of the file, or default if it does not exist.
+    """
+    try:
+        with open(path, 'r') as f:
+            return f.read()
+    except FileNotFoundError:
+        return default
+
+
+def atomic_write(path, data, durable=False):
+    """
+    Replaces the contents of a file with a single rename. Does not lock; use
+    update() when the new contents depend on the old ones.
+    Args:
+        path (str): The file to write.
+        data (str or bytes): The new contents.
+        durable (bool): Sync the file to disk before returning instead of with the next batch.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.' + os.path.basename(path) + '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb' if isinstance(data, bytes) else 'w') as f:
+            f.write(data)
+            if durable:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    if durable:
+        _sync_directory(directory)
+    else:
+        _mark_written(path)
+
+
+def update(path, change, default=''):
+    """
+    Reads a text file, changes its contents and writes them back, holding the
+    file's lock throughout so no other client's update is lost.
+    Args:
+        path (str): The file to update.
+        change (function): Takes the old contents and returns the new ones; returning None leaves the file alone.
+        default (str): The contents to start from if the file does not exist.
+    Returns:
+        str: The old contents.
+    """
+    with locked(path):
+        old = read_text(path, default)
+        new = change(old)
+        if new is not None and new != old:
+            atomic_write(path, new)
+    return old
+
+
+def append(path, text):
+    """
+    Appends text to a file in one locked write, so lines from different clients
+    never interleave.
+    Args:
+        path (str): The file to append to.
+        text (str): The text to append.
+    """
+    with locked(path):
+        with open(path, 'a') as f:
+            f.write(text)
+    _mark_written(path)
+
+
+def _mark_written(path):
+    global _pending_since
+    if not _pending:
+        _pending_since = time.monotonic()
+    _pending.add(os.path.abspath(path))
+    sync_due()
+
+
+def _sync_directory(directory):
+    # Makes a rename durable; directories cannot be opened for syncing on Windows
+    if os.name == 'nt':
+        return
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def sync_due():
+    """
+    Syncs the files written since the last sync if the oldest of them has
+    waited SYNC_INTERVAL seconds. The scene manager calls it every frame.
+    """
+    if _pending and time.monotonic() - _pending_since >= SYNC_INTERVAL:
+        sync_pending()
+
+
+def sync_pending():
+    """
+    Syncs every file written since the last sync to disk, along with the
+    directories holding them. Runs automatically when the game exits.
+    """
+    global _pending_since
+    paths = list(_pending)
+    _pending.clear()
+    _pending_since = None
+    for path in paths:
+        try:
+            fd = os.open(path, os.O_RDWR)
+        except OSError:
+            continue
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+    for directory in {os.path.dirname(path) for path in paths}:
+        _sync_directory(directory)
+
+
+atexit.register(sync_pending)
+
+
+def connect(path):
+    """
+    Opens an SQLite database so that clients sharing it wait for each other's
+    writes instead of failing with "database is locked".
+    Args:
+        path (str): The database file.
+    Returns:
+        sqlite3.Connection: The connection.
+    """
+    # The default rollback journal is kept on purpose: WAL mode needs shared
+    # memory and does not work on network file systems
+    return sqlite3.connect(path, timeout=BUSY_TIMEOUT)
@@ -0,0 +1,296 @@
+"""
+Built-in frame profiler.
+
+Pressing F3 in any screen shows an overlay with the recent frame times split
+into phases: handling events, dispatching them to the draggable answers,
+updating, drawing the scene and pushing it to the display. It also shows the
+text cache's hit rate and the net change in memory blocks per frame, so when
+a classroom reports lag the slow phase can be seen without outside tools.
+
+While the overlay is showing, a background thread samples the game loop's
+stack. Pressing F4 writes the samples of the last few seconds as folded stacks
+(one "outer;inner;innermost count" line per stack), which flamegraph.pl,
+speedscope and similar tools turn into a flame graph.
+
+Nothing is timed or sampled while the overlay is hidden.
+
+Classes:
+    FrameProfiler: Times the phases of each frame and draws the overlay.
+    StackSampler: Samples a thread's stack in the background.
+
+Functions:
+    timed(phase): Decorator that adds a function's time to a phase of the frame.
+"""
+import functools
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+
+import pygame
+
+import assets
+import text_cache
+
+# The phases of a frame, in the order they happen
+PHASES = ('events', 'dispatch', 'update', 'draw', 'display')
+# Phases timed inside another one; their time is taken out of the outer phase
+NESTED = {'dispatch': 'events'}
+# How many recent frames the overlay is taken over
+STATS_WINDOW = 120
+# How often the overlay text is refreshed, in seconds, so it can be read
+REFRESH_INTERVAL = 0.25
+# How often the stack is sampled and how far back F4 dumps, in seconds
+SAMPLE_INTERVAL = 0.005
+SAMPLE_SECONDS = 10
+
+OVERLAY_POS = (10, 10)
+OVERLAY_COLOR = (255, 255, 255)
+OVERLAY_BACKGROUND = (0, 0, 0, 190)
+
+# The profiler that is currently recording, if any
+_active = None
+
+
+def timed(phase):
+    """
+    Decorator that adds the time spent in a function to a phase of the current
+    frame while the profiler is recording. Otherwise it only calls the function.
+    Args:
+        phase (str): One of PHASES.
+    """
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            profiler = _active
+            if profiler is None:
+                return function(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                profiler.add(phase, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def _label(code):
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """
+    Samples a thread's stack at a fixed interval and keeps the recent samples.
+
+    Methods:
+        start(), stop(): Start and stop sampling.
+        folded(seconds): The recent samples as folded stacks.
+    """
+    def __init__(self, thread_id, interval=SAMPLE_INTERVAL, seconds=SAMPLE_SECONDS):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.seconds = seconds
+        self.samples = deque()
+        self._labels = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _stack(self, frame):
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            label = self._labels.get(code)
+            if label is None:
+                label = self._labels[code] = _label(code)
+            names.append(label)
+            frame = frame.f_back
+        return ';'.join(reversed(names))
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            now = time.monotonic()
+            self.samples.append((now, self._stack(frame)))
+            while self.samples and self.samples[0][0] < now - self.seconds:
+                self.samples.popleft()
+
+    def folded(self, seconds=None):
+        """
+        Returns:
+            list[str]: "stack count" lines for the samples of the last seconds, busiest first.
+        """
+        since = time.monotonic() - (self.seconds if seconds is None else seconds)
+        counts = Counter(stack for at, stack in list(self.samples) if at >= since)
+        return [f"{stack} {count}" for stack, count in counts.most_common()]
+
+
+class FrameProfiler:
+    """
+    Times the phases of each frame and draws them over the scene.
+
+    The scene manager calls start() when a frame begins and lap(phase) as each
+    phase ends; timed() adds phases that happen inside another one.
+
+    Attributes:
+        enabled (bool): Whether the overlay is showing and frames are being timed.
+        frames (deque): (phase times in seconds, net change in allocated blocks) for the recent frames.
+        rect (pygame.Rect): Where the overlay was last drawn.
+
+    Methods:
+        toggle(): Shows or hides the overlay.
+        start(), lap(phase), add(phase, seconds), end(): Time a frame.
+        draw(win): Draws the overlay.
+        dump(path): Writes the recent stack samples as folded stacks.
+    """
+    def __init__(self):
+        self.enabled = False
+        self.frames = deque(maxlen=STATS_WINDOW)
+        self.rect = pygame.Rect(OVERLAY_POS, (0, 0))
+        self.message = ''
+        self.sampler = StackSampler(threading.get_ident())
+        self._times = dict.fromkeys(PHASES, 0.0)
+        self._mark = None
+        self._blocks = 0
+        self._cache_start = (0, 0)
+        self._surface = None
+        self._refreshed = 0.0
+
+    def toggle(self):
+        global _active
+        self.enabled = not self.enabled
+        if self.enabled:
+            self.frames.clear()
+            stats = text_cache.stats()
+            self._cache_start = (stats['hits'], stats['misses'])
+            self._mark = None
+            self._surface = None
+            self.message = ''
+            # The sampler watches the thread the game loop runs on
+            self.sampler.thread_id = threading.get_ident()
+            self.sampler.start()
+            _active = self
+        else:
+            self.sampler.stop()
+            _active = None
+
+    def start(self):
+        if not self.enabled:
+            return
+        self._times = dict.fromkeys(PHASES, 0.0)
+        self._blocks = sys.getallocatedblocks()
+        self._mark = time.perf_counter()
+
+    def lap(self, phase):
+        """Ends a phase: the time since the last lap goes to it."""
+        if not self.enabled or self._mark is None:
+            return
+        now = time.perf_counter()
+        self._times[phase] += now - self._mark
+        self._mark = now
+
+    def add(self, phase, seconds):
+        self._times[phase] += seconds
+        outer = NESTED.get(phase)
+        if outer is not None:
+            self._times[outer] -= seconds
+
+    def end(self):
+        if not self.enabled or self._mark is None:
+            return
+        self.frames.append((self._times, sys.getallocatedblocks() - self._blocks))
+        self._mark = None
+
+    def summary(self):
+        """
+        Returns:
+            dict: Average and worst frame time, average time per phase in milliseconds,
+            the text cache's hit rate since the overlay was shown and the net change in
+            allocated blocks per frame (allocated minus freed, so it can be negative).
+        """
+        count = len(self.frames) or 1
+        totals = [sum(times.values()) for times, _ in self.frames] or [0.0]
+        stats = text_cache.stats()
+        hits = stats['hits'] - self._cache_start[0]
+        misses = stats['misses'] - self._cache_start[1]
+        return {
+            'frame_ms': sum(totals) / count * 1000,
+            'max_ms': max(totals) * 1000,
+            'phase_ms': {phase: sum(times[phase] for times, _ in self.frames) / count * 1000
+                         for phase in PHASES},
+            'cache_hit_rate': hits / (hits + misses) if hits + misses else 1.0,
+            'cache_misses': misses,
+            'net_blocks_per_frame': sum(blocks for _, blocks in self.frames) / count,
+        }
+
+    def _render(self):
+        summary = self.summary()
+        lines = [f"frame {summary['frame_ms']:6.2f} ms   max {summary['max_ms']:6.2f} ms"]
+        lines += [f"{phase:<9}{ms:6.2f} ms" for phase, ms in summary['phase_ms'].items()]
+        lines.append(f"text cache {summary['cache_hit_rate']:.0%} hits, {summary['cache_misses']} misses")
+        lines.append(f"net blocks {summary['net_blocks_per_frame']:+.0f}/frame")
+        lines.append(self.message or f"F4: save the last {SAMPLE_SECONDS} s of stacks")
+
+        font = assets.get_font(None, 24)
+        rendered = [font.render(line, True, OVERLAY_COLOR) for line in lines]
+        width = max(surface.get_width() for surface in rendered) + 12
+        height = sum(surface.get_height() for surface in rendered) + 12
+        surface = pygame.Surface((width, height), pygame.SRCALPHA)
+        surface.fill(OVERLAY_BACKGROUND)
+        y = 6
+        for line in rendered:
+            surface.blit(line, (6, y))
+            y += line.get_height()
+        return surface
+
+    def draw(self, win):
+        """
+        Draws the overlay. Its own time is not counted in any phase.
+        Returns:
+            pygame.Rect: The area it covers.
+        """
+        start = time.perf_counter()
+        if self._surface is None or start - self._refreshed >= REFRESH_INTERVAL:
+            self._surface = self._render()
+            self._refreshed = start
+        self.rect = win.blit(self._surface, OVERLAY_POS)
+        if self._mark is not None:
+            self._mark += time.perf_counter() - start
+        return self.rect
+
+    def dump(self, path=None):
+        """
+        Writes the stack samples of the last SAMPLE_SECONDS as folded stacks.
+        Args:
+            path (str): The file to write; named after the current time by default.
+        Returns:
+            str: The file written, or None if there were no samples.
+        """
+        lines = self.sampler.folded()
+        if not lines:
+            self.message = "No samples yet"
+            self._surface = None
+            return None
+        if path is None:
+            path = time.strftime("profile-%Y%m%d-%H%M%S.folded")
+        with open(path, 'w') as f:
+            f.write('\n'.join(lines) + '\n')
+        self.message = f"Saved {path}"
+        self._surface = None
+        print(f"Saved {len(lines)} stacks to {path}")
+        return path
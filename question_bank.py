@@ -0,0 +1,206 @@
+"""
+Question bank for Logic Quest.
+
+Parses questions.txt, options.txt, answers.txt and difficulty.txt and checks
+that they line up by question number. The game does not read the bank from
+here: question_store.py imports it into its database whenever the files change.
+
+Classes:
+    Question: A single question with its options, answer, difficulty and tags.
+    QuestionBank: The parsed question bank.
+    QuestionBankError: Raised when the question files do not line up.
+"""
+import os
+from collections import namedtuple
+
+QUESTIONS_FILE = 'questions.txt'
+OPTIONS_FILE = 'options.txt'
+ANSWERS_FILE = 'answers.txt'
+DIFFICULTY_FILE = 'difficulty.txt'
+
+# Questions without an entry in difficulty.txt are worth this many points
+DEFAULT_DIFFICULTY = 1
+
+# Tags are only kept by question_store.py; the text files have none
+Question = namedtuple('Question', ['number', 'text', 'options', 'answer', 'difficulty', 'tags'], defaults=((),))
+
+
+class QuestionBankError(ValueError):
+    pass
+
+
+def _split_number(line):
+    """
+    Splits a numbered line such as "12.r->p^s" into its number and text.
+    Args:
+        line (str): The line to split.
+    Returns:
+        tuple: (number, text), or None if the line is not numbered.
+    """
+    number, dot, text = line.partition('.')
+    if not dot or not number.strip().isdigit():
+        return None
+    return int(number), text.strip()
+
+
+def iter_numbered(path):
+    """
+    Reads a file of "N.text" lines one line at a time, skipping blank lines.
+    Args:
+        path (str): The file path.
+    Yields:
+        tuple: (line_number, number, text); number is None if the line is not numbered,
+        and text is then the whole line.
+    """
+    with open(path, 'r') as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            parsed = _split_number(line)
+            if parsed is None:
+                yield line_number, None, line.strip()
+            else:
+                yield line_number, parsed[0], parsed[1]
+
+
+def iter_options(path):
+    """
+    Reads options.txt one question at a time. Each question's options follow an "N." header line.
+    Args:
+        path (str): The file path.
+    Yields:
+        tuple: (line_number, number, options), where line_number is that of the header.
+        Options before the first header come with a number of None.
+    """
+    line_number, number, options = None, None, []
+    with open(path, 'r') as f:
+        for index, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            parsed = _split_number(line)
+            if parsed is not None and parsed[1] == '':
+                if number is not None or options:
+                    yield line_number, number, tuple(options)
+                line_number, number, options = index, parsed[0], []
+            else:
+                if line_number is None:
+                    line_number = index
+                options.append(line)
+    if number is not None or options:
+        yield line_number, number, tuple(options)
+
+
+def parse_numbered(path):
+    """
+    Parses a file of "N.text" lines, skipping blank lines.
+    Args:
+        path (str): The file path.
+    Returns:
+        dict[int, str]: The text of each numbered line.
+    """
+    entries = {}
+    for line_number, number, text in iter_numbered(path):
+        if number is None:
+            raise QuestionBankError(f"{path}:{line_number}: expected 'N.text', got {text!r}")
+        if number in entries:
+            raise QuestionBankError(f"{path}:{line_number}: question {number} appears twice")
+        entries[number] = text
+    return entries
+
+
+def parse_options(path):
+    """
+    Parses options.txt, where each question's options follow an "N." header line.
+    Args:
+        path (str): The file path.
+    Returns:
+        dict[int, tuple]: The options of each question.
+    """
+    entries = {}
+    for line_number, number, options in iter_options(path):
+        if number is None:
+            raise QuestionBankError(f"{path}:{line_number}: option {options[0]!r} comes before any 'N.' header")
+        if number in entries:
+            raise QuestionBankError(f"{path}:{line_number}: question {number} appears twice")
+        entries[number] = options
+    return entries
+
+
+class QuestionBank:
+    """
+    The parsed question bank. Questions are stored column by column;
+    Question tuples are built on access.
+
+    Methods:
+        parse(directory): Parses the text files.
+        source_key(directory): What the text files look like now.
+    """
+    def __init__(self, numbers, texts, options, answers, difficulties):
+        self.numbers = numbers
+        self.texts = texts
+        self.options = options
+        self.answers = answers
+        self.difficulties = difficulties
+
+    def __len__(self):
+        return len(self.numbers)
+
+    def __getitem__(self, index):
+        return Question(self.numbers[index], self.texts[index], self.options[index],
+                        self.answers[index], self.difficulties[index])
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    @staticmethod
+    def source_key(directory='.'):
+        """
+        Returns the (name, mtime, size) of every source file, used to tell whether an import is stale.
+        """
+        key = []
+        for name in (QUESTIONS_FILE, OPTIONS_FILE, ANSWERS_FILE, DIFFICULTY_FILE):
+            try:
+                stat = os.stat(os.path.join(directory, name))
+            except FileNotFoundError:
+                key.append((name, None, None))
+            else:
+                key.append((name, stat.st_mtime_ns, stat.st_size))
+        return tuple(key)
+
+    @classmethod
+    def parse(cls, directory='.'):
+        """
+        Parses the question files and checks that they line up by question number.
+        Args:
+            directory (str): The directory holding the question files.
+        Returns:
+            QuestionBank: The parsed bank.
+        Raises:
+            QuestionBankError: If a file is malformed or the files do not line up.
+        """
+        questions = parse_numbered(os.path.join(directory, QUESTIONS_FILE))
+        options = parse_options(os.path.join(directory, OPTIONS_FILE))
+        answers = parse_numbered(os.path.join(directory, ANSWERS_FILE))
+        difficulty_path = os.path.join(directory, DIFFICULTY_FILE)
+        difficulties = parse_numbered(difficulty_path) if os.path.exists(difficulty_path) else {}
+
+        numbers = sorted(questions)
+        for name, entries in ((OPTIONS_FILE, options), (ANSWERS_FILE, answers)):
+            missing = sorted(set(questions) - set(entries))
+            extra = sorted(set(entries) - set(questions))
+            if missing or extra:
+                raise QuestionBankError(f"{name} does not line up with {QUESTIONS_FILE}: "
+                                        f"missing {missing}, unexpected {extra}")
+
+        try:
+            difficulty_column = [int(difficulties.get(n, DEFAULT_DIFFICULTY)) for n in numbers]
+        except ValueError as e:
+            raise QuestionBankError(f"{DIFFICULTY_FILE}: {e}") from None
+
+        return cls(numbers,
+                   [questions[n] for n in numbers],
+                   [options[n] for n in numbers],
+                   [answers[n] for n in numbers],
+                   difficulty_column)
@@ -0,0 +1,160 @@
+"""
+Procedural question generator.
+
+Builds random well-formed formulas over p, q, r and s, phrases them in English
+the same way questions.txt does ("if p then r", "q if and only if s") and picks
+distractor options that are guaranteed to mean something different from the
+answer and from each other, by comparing truth-table fingerprints.
+
+Questions are produced lazily, so Lightning Mode can keep asking new ones once
+the hand-written bank runs out.
+
+Functions:
+    random_formula(rng): Builds a random formula.
+    to_english(formula): Phrases a formula in English.
+    generate_question(rng, number): Builds one question.
+    generate_questions(seed, start_number): Yields questions forever.
+    endless_questions(bank, seed): Yields the bank's questions, then generated ones forever.
+"""
+import itertools
+import random
+
+from grading import fingerprint
+from logic import AND, IFF, IMPLIES, OR, PRECEDENCE, RIGHT_ASSOCIATIVE, BinOp, Not, Var
+from question_bank import Question
+
+VARIABLES = ('p', 'q', 'r', 's')
+OPERATORS = (AND, OR, IMPLIES, IFF)
+NUM_OPTIONS = 4
+
+# The ways questions.txt phrases each operator
+PHRASES = {
+    AND: ("{} and {}",),
+    OR: ("{} or {}",),
+    IMPLIES: ("if {} then {}", "{} implies {}"),
+    IFF: ("{} if and only if {}", "{} biconditional {}", "if and only if {} then {}"),
+}
+
+
+def random_formula(rng, depth=None):
+    """
+    Builds a random formula with one or two operators, like the ones in answers.txt.
+    Args:
+        rng (random.Random): The random number generator.
+        depth (int): 1 for a single operator, 2 for a nested one; random if None.
+    Returns:
+        Formula: The formula. Its variables are all different.
+    """
+    if depth is None:
+        depth = rng.choice((1, 2, 2))
+    names = rng.sample(VARIABLES, depth + 1)
+    if depth == 1:
+        return BinOp(rng.choice(OPERATORS), Var(names[0]), Var(names[1]))
+    inner = BinOp(rng.choice(OPERATORS), Var(names[0]), Var(names[1]))
+    if rng.random() < 0.5:
+        return BinOp(rng.choice(OPERATORS), inner, Var(names[2]))
+    return BinOp(rng.choice(OPERATORS), Var(names[2]), inner)
+
+
+def _mutate(formula, rng):
+    # Change one operator or one variable somewhere in the formula
+    if isinstance(formula, Var):
+        return Var(rng.choice([name for name in VARIABLES if name != formula.name]))
+    if isinstance(formula, Not):
+        return formula.operand if rng.random() < 0.5 else Not(_mutate(formula.operand, rng))
+    choice = rng.randrange(3)
+    if choice == 0:
+        return BinOp(rng.choice([op for op in OPERATORS if op != formula.op]), formula.left, formula.right)
+    if choice == 1:
+        return BinOp(formula.op, _mutate(formula.left, rng), formula.right)
+    return BinOp(formula.op, formula.left, _mutate(formula.right, rng))
+
+
+def to_english(formula, rng=None):
+    """
+    Phrases a formula in English, in the style of questions.txt.
+    Args:
+        formula (Formula): The formula.
+        rng (random.Random): Picks between equivalent phrasings; the first phrasing is used if None.
+    Returns:
+        str: The English phrasing, e.g. "if and only if (if q then p) then s".
+    """
+    if isinstance(formula, Var):
+        return formula.name
+    if isinstance(formula, Not):
+        return f"not {to_english(formula.operand, rng)}"
+    phrases = PHRASES[formula.op]
+    phrase = rng.choice(phrases) if rng else phrases[0]
+    left = to_english(formula.left, rng)
+    right = to_english(formula.right, rng)
+    if _needs_brackets(formula, formula.left, 'left') or left.startswith('if '):
+        left = f"({left})"
+    if _needs_brackets(formula, formula.right, 'right') or right.startswith('if '):
+        right = f"({right})"
+    return phrase.format(left, right)
+
+
+def _needs_brackets(parent, child, side):
+    # The same rule str() uses for the symbolic notation
+    if not isinstance(child, BinOp):
+        return False
+    parent_precedence, child_precedence = PRECEDENCE[parent.op], PRECEDENCE[child.op]
+    if child_precedence != parent_precedence:
+        return child_precedence < parent_precedence
+    return (side == 'left') == (parent.op in RIGHT_ASSOCIATIVE)
+
+
+def generate_question(rng, number):
+    """
+    Builds one question with an answer and distractors that all mean different things.
+    Args:
+        rng (random.Random): The random number generator.
+        number (int): The question number.
+    Returns:
+        Question: The generated question.
+    """
+    answer = random_formula(rng)
+    seen = {fingerprint(answer, VARIABLES)}
+    distractors = []
+    while len(distractors) < NUM_OPTIONS - 1:
+        # Mostly near misses of the answer, with some unrelated formulas mixed in
+        if rng.random() < 0.75:
+            candidate = _mutate(answer, rng)
+        else:
+            candidate = random_formula(rng)
+        key = fingerprint(candidate, VARIABLES)
+        if key not in seen:
+            seen.add(key)
+            distractors.append(candidate)
+
+    options = [str(answer)] + [str(distractor) for distractor in distractors]
+    rng.shuffle(options)
+    difficulty = 1 if isinstance(answer.left, Var) and isinstance(answer.right, Var) else 2
+    return Question(number, to_english(answer, rng), tuple(options), str(answer), difficulty)
+
+
+def generate_questions(seed=None, start_number=1):
+    """
+    Yields generated questions forever.
+    Args:
+        seed: Seed for the random number generator, for repeatable sequences.
+        start_number (int): The number of the first question.
+    Yields:
+        Question: The next generated question.
+    """
+    rng = random.Random(seed)
+    for number in itertools.count(start_number):
+        yield generate_question(rng, number)
+
+
+def endless_questions(bank, seed=None):
+    """
+    Yields every question of the bank in order, then generated questions forever.
+    Args:
+        bank (QuestionBank): The hand-written questions.
+        seed: Seed for the generated questions.
+    Yields:
+        Question: The next question.
+    """
+    yield from bank
+    yield from generate_questions(seed, len(bank) + 1)
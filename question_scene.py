@@ -0,0 +1,175 @@
+"""
+Shared base for the multiple choice modes.
+
+Training, lightning and instructor mode all show one question at a time, with
+its answer choices dealt out below it as draggable items to be dropped into an
+answer box. QuestionScene holds what they have in common: the question window
+that prepares questions ahead of time, dealing the choices, the drag
+dispatcher and the feedback message. Each mode only adds its own buttons,
+scoring and drawing.
+
+Classes:
+    QuestionScene: Base class for the multiple choice modes.
+"""
+import pygame
+
+import assets
+import question_store
+from grading import answer_key
+from layout import Layout, BOTTOM_LEFT
+from question_window import Prepared, QuestionWindow
+from scene_manager import Scene
+from widgets import DragDispatcher, create_draggable_items, black
+
+TOP_MARGIN = 50
+BOTTOM_MARGIN = 100
+LEFT_MARGIN = 50
+BLANK_WIDTH = 100
+BLANK_HEIGHT = 30
+ANSWER_ITEM_SPACING = 120
+
+
+class QuestionScene(Scene):
+    """
+    Base class for the multiple choice modes.
+
+    Subclasses call open_questions() with the questions to show, add their own
+    widgets to self.layout and place them in place_widgets().
+
+    Attributes:
+        question_font_size (int): The size of the question text.
+        SOL_BOX_X, SOL_BOX_Y (int): The top left corner of the answer box.
+        question (Question): The question on screen.
+        current_question_index (int): Its position.
+
+    Methods:
+        open_questions(questions): Starts showing questions from an iterator of (position, question).
+        show_question(): Shows the current question of the question window.
+        next_question(): Moves on to the next question.
+        prepare_question(item): Renders a question's text and number ahead of time.
+        deal_items(): Puts the current question's answer choices in the answer bank.
+        set_feedback(text, update): Changes the feedback message.
+    """
+    tracks_dirty = True
+    question_font_size = 20
+    SOL_BOX_X = 375
+    SOL_BOX_Y = 200
+
+    def __init__(self, manager):
+        super().__init__(manager)
+        self.font = assets.get_font("arial", 45)
+        self.smallfont = assets.get_font("arial", 20)
+
+        self.feedback_text = ""
+        self.feedback_update = False
+
+        # Subclasses add their own widgets; everything is placed again whenever the window is resized
+        self.layout = Layout()
+        self.layout.add('answer_bank', anchor=BOTTOM_LEFT, offset=(0, -BOTTOM_MARGIN + 20))
+
+        self.bank = question_store.load()
+        self.current_question_index = 0
+        self.questions = None
+        # Fonts only the prefetch thread renders with
+        self.prefetch_fonts = (assets.new_font("arial", self.question_font_size), assets.new_font("arial", 45))
+
+        self.blanks = [
+             pygame.Rect(LEFT_MARGIN, TOP_MARGIN + 200, BLANK_WIDTH, BLANK_HEIGHT),
+             # Add more Rects for blanks if needed
+        ]
+
+    def open_questions(self, questions):
+        """
+        Starts showing questions, replacing the ones shown so far.
+        Args:
+            questions (iterator): (position, question) pairs, read on the prefetch thread.
+        """
+        if self.questions is not None:
+            self.questions.stop()
+        self.questions = QuestionWindow(questions, self.prepare_question)
+        self.show_question()
+
+    def on_enter(self):
+        self.questions.start()
+
+    def on_leave(self):
+        # Nothing is prepared while the pause menu is showing or once the mode is closed
+        self.questions.stop()
+
+    def on_resize(self, width, height):
+        self.layout.resolve((width, height))
+        self.BG = assets.get_background((width, height))
+        self.ANSWER_BANK_Y = self.layout['answer_bank'].y
+        self.place_widgets()
+        # The answer choices go back to the answer bank at its new position
+        self.deal_items()
+
+    def place_widgets(self):
+        pass
+
+    def is_active(self):
+        # Only dragging needs frames without input
+        return any(item.dragging for item in self.items)
+
+    def prepare_question(self, item):
+        # Runs on the prefetch thread, so it only uses the prefetch fonts
+        position, question = item
+        question_font, font = self.prefetch_fonts
+        return Prepared(position, question, answer_key(question),
+                        question_font.render(question.text, True, black),
+                        font.render(f"Question Number: {position + 1}", True, black))
+
+    def show_question(self):
+        prepared = self.questions.current
+        self.current_question_index = prepared.position
+        self.question = prepared.question
+        self.question_description_text = prepared.text
+        self.question_number_text = prepared.number_text
+
+    def next_question(self):
+        self.questions.advance()
+        self.show_question()
+        self.deal_items()
+        self.dirty.invalidate()
+
+    def get_current_options(self):
+        return self.question.options
+
+    def get_current_answer(self):
+        return self.question.answer
+
+    def get_answer_key(self):
+        return self.questions.current.key
+
+    @property
+    def answer_box(self):
+        return (self.SOL_BOX_X, self.SOL_BOX_Y, 100, 50)
+
+    def create_draggable_items(self):
+        return create_draggable_items(self.get_current_options(), self.get_answer_key(), self.smallfont,
+                                      self.manager.width, self.ANSWER_BANK_Y,
+                                      self.answer_box, spacing=ANSWER_ITEM_SPACING)
+
+    def deal_items(self):
+        # Only the dispatcher hit-tests the answer choices
+        self.items = self.create_draggable_items()
+        self.drag = DragDispatcher(self.items)
+
+    def get_feedback_message(self):
+        """
+        Returns:
+            tuple: The rendered feedback message and its position, or None if there is no feedback.
+        """
+        return None
+
+    def mark_feedback_dirty(self):
+        feedback_message = self.get_feedback_message()
+        if feedback_message:
+            self.dirty.add(feedback_message[0].get_rect(topleft=feedback_message[1]))
+
+    def set_feedback(self, text, update):
+        # Redraw where the old message was and where the new one goes
+        self.mark_feedback_dirty()
+        self.feedback_text = text
+        self.feedback_update = update
+        self.mark_feedback_dirty()
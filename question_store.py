@@ -0,0 +1,238 @@
+"""
+Question store for Logic Quest.
+
+The question files spread each question over four text files, lined up by
+question number, so reading any one question means parsing all of them. The
+store keeps every question in a single SQLite table instead, one row per
+question holding its text, options, answer, difficulty and tags, keyed by its
+position in the bank. Fetching question N is a single primary key lookup and
+only the questions the game actually shows are ever read into memory, however
+big the bank is.
+
+The text files stay the way questions are written. The first time the store
+is opened after any of them changes, they are imported again in one go. A
+store can also be used on its own, without any text files next to it.
+
+Usage:
+    python question_store.py import [directory]
+
+Classes:
+    QuestionStore: Lazy, indexed access to the questions in the store.
+
+Functions:
+    import_text(directory, path): Imports the question files into a store.
+    build(directory): Imports the question files if they changed since the last import.
+    load(directory): The store shared by every scene in the process.
+"""
+import json
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import persistence
+from question_bank import Question, QuestionBank
+
+DB_FILE = 'questions.db'
+
+# Questions kept in memory after they are read; a scene only looks at a few
+MAX_CACHED = 64
+
+_stores = {}
+# Only one thread imports at a time, e.g. the login page's warmer and a scene opening
+_build_lock = threading.Lock()
+
+
+def _create(conn):
+    with conn:
+        conn.execute("CREATE TABLE IF NOT EXISTS questions ("
+                     "position INTEGER PRIMARY KEY, number INTEGER NOT NULL UNIQUE, text TEXT NOT NULL, "
+                     "options TEXT NOT NULL, answer TEXT NOT NULL, difficulty INTEGER NOT NULL, "
+                     "tags TEXT NOT NULL DEFAULT '[]')")
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+
+
+def _source(directory):
+    # What the text files looked like at the last import, or None if there are none
+    key = QuestionBank.source_key(directory)
+    if all(mtime is None for _, mtime, _ in key):
+        return None
+    return json.dumps(key)
+
+
+class QuestionStore:
+    """
+    Lazy, indexed access to the questions in the store. Behaves like a read-only
+    list of Question tuples. It can be read from several threads, e.g. by a
+    QuestionWindow prefetching on a background thread; each thread gets its
+    own connection, as SQLite connections cannot be shared between threads.
+
+    Methods:
+        __len__(): The number of questions.
+        __getitem__(index): The question at a position, read from the database on first use.
+        find(number): The question with a question number.
+        close(): Closes the calling thread's connection.
+    """
+    def __init__(self, path=DB_FILE):
+        self.path = path
+        self._local = threading.local()
+        _create(self.conn)
+        self._lock = threading.Lock()
+        self._cache = OrderedDict()
+        self._count = None
+
+    @property
+    def conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = persistence.connect(self.path)
+            self._local.version = None
+        return conn
+
+    def _check_version(self):
+        # data_version changes when another connection, e.g. a new import, changes the file.
+        # Each connection numbers its own versions, so each thread remembers the last one it saw
+        version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+        if version != self._local.version:
+            if self._local.version is not None:
+                with self._lock:
+                    self._count = None
+                    self._cache.clear()
+            self._local.version = version
+
+    def __len__(self):
+        self._check_version()
+        count = self._count
+        if count is None:
+            count = self._count = self.conn.execute("SELECT COUNT(*) FROM questions").fetchone()[0]
+        return count
+
+    def __getitem__(self, index):
+        length = len(self)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError(f"question index {index} out of range")
+        with self._lock:
+            question = self._cache.get(index)
+            if question is not None:
+                self._cache.move_to_end(index)
+                return question
+
+        row = self.conn.execute("SELECT number, text, options, answer, difficulty, tags FROM questions "
+                                "WHERE position = ?", (index,)).fetchone()
+        question = self._question(row)
+        with self._lock:
+            self._cache[index] = question
+            if len(self._cache) > MAX_CACHED:
+                self._cache.popitem(last=False)
+        return question
+
+    def __iter__(self):
+        # One lookup per question, so iterating never holds the whole bank
+        for index in range(len(self)):
+            yield self[index]
+
+    @staticmethod
+    def _question(row):
+        number, text, options, answer, difficulty, tags = row
+        return Question(number, text, tuple(json.loads(options)), answer, difficulty, tuple(json.loads(tags)))
+
+    def find(self, number):
+        """
+        Returns:
+            Question: The question with this question number, or None if there is none.
+        """
+        row = self.conn.execute("SELECT number, text, options, answer, difficulty, tags FROM questions "
+                                "WHERE number = ?", (number,)).fetchone()
+        return None if row is None else self._question(row)
+
+    def close(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+def import_text(directory='.', path=None):
+    """
+    Imports the question files into a store, replacing whatever it held.
+    Args:
+        directory (str): The directory holding the question files.
+        path (str): The store; questions.db in the directory by default.
+    Returns:
+        int: The number of questions imported.
+    Raises:
+        QuestionBankError: If the question files are malformed or do not line up.
+    """
+    # Read before parsing, so files changed meanwhile still look out of date to build()
+    source = _source(directory)
+    bank = QuestionBank.parse(directory)
+    conn = persistence.connect(path or os.path.join(directory, DB_FILE))
+    try:
+        _create(conn)
+        # One transaction, so readers see either the old questions or the new ones
+        with conn:
+            conn.execute("DELETE FROM questions")
+            conn.executemany("INSERT INTO questions VALUES (?, ?, ?, ?, ?, ?, ?)",
+                             ((position, question.number, question.text, json.dumps(question.options),
+                               question.answer, question.difficulty, json.dumps(question.tags))
+                              for position, question in enumerate(bank)))
+            conn.execute("INSERT OR REPLACE INTO meta VALUES ('source', ?)", (source,))
+    finally:
+        conn.close()
+    return len(bank)
+
+
+def build(directory='.'):
+    """
+    Imports the question files into the directory's store unless it already
+    holds them as they are now.
+    Returns:
+        str: The path of the store.
+    """
+    path = os.path.join(directory, DB_FILE)
+    with _build_lock:
+        source = _source(directory)
+        if source is None:
+            # A store without question files is used as it is
+            return path
+        conn = persistence.connect(path)
+        try:
+            _create(conn)
+            row = conn.execute("SELECT value FROM meta WHERE key = 'source'").fetchone()
+        finally:
+            conn.close()
+        if row is None or row[0] != source:
+            import_text(directory, path)
+    return path
+
+
+def load(directory='.'):
+    """
+    Returns the directory's store, shared by every scene in the process, after
+    importing the question files again if they changed.
+    Args:
+        directory (str): The directory holding the store and question files.
+    Returns:
+        QuestionStore: The store.
+    """
+    path = build(directory)
+    store = _stores.get(directory)
+    if store is None:
+        store = _stores[directory] = QuestionStore(path)
+    return store
+
+
+def main(argv):
+    if not argv or argv[0] != 'import' or len(argv) > 2:
+        print(__doc__)
+        return 1
+    directory = argv[1] if len(argv) == 2 else '.'
+    count = import_text(directory)
+    print(f"Imported {count} questions into {os.path.join(directory, DB_FILE)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,199 @@
+"""
+Windowed question loading for the game modes.
+
+Training and lightning mode hold only the question on screen and the next few.
+A background thread reads those from the question store and prepares them:
+it renders their text and works out their answer key while the player is
+still on the current question. "Next Question" then takes a question that is
+already prepared instead of waiting on the disk or the font renderer, and
+opening a mode costs the same however big the bank is. The last few questions
+shown are kept too, so instructor mode's "Prev Question" can go back to them
+without preparing them again.
+
+SDL_ttf fonts must not be used from two threads at once, so the text is
+rendered ahead with fonts from assets.new_font() that only the window's thread
+uses.
+
+Classes:
+    Prepared: A question ready to be shown.
+    QuestionWindow: The current question and the next few, prepared ahead.
+
+Functions:
+    cycle(bank, start): Yields (position, question) round the bank from a position.
+"""
+import threading
+from collections import deque, namedtuple
+
+# Questions prepared ahead of the one on screen
+PREFETCH = 3
+# Questions kept after moving on from them, for going back
+KEEP_BEHIND = 3
+
+# A question with its position, answer key and rendered text and number
+Prepared = namedtuple('Prepared', ['position', 'question', 'key', 'text', 'number_text'])
+
+
+def cycle(bank, start=0):
+    """
+    Goes round the bank from a position, one lookup at a time, forever.
+    Args:
+        bank (QuestionStore): The questions.
+        start (int): The position of the first question.
+    Yields:
+        tuple: (position, question).
+    """
+    position = start
+    while True:
+        # The bank can be imported again while a mode is open
+        position %= len(bank)
+        yield position, bank[position]
+        position += 1
+
+
+class QuestionWindow:
+    """
+    The current question and the next few, prepared ahead on a background thread.
+
+    The thread only runs while the scene using the window is showing: scenes
+    call stop() when they are covered or closed and start() when they are
+    shown again.
+
+    Attributes:
+        ahead (int): How many questions are prepared ahead of the current one.
+        behind (int): How many questions are kept after moving on from them.
+        stalls (int): How many times moving on had to wait for a question to be prepared.
+
+    Methods:
+        current: The question on screen.
+        advance(): Moves on to the next question.
+        back(): Moves back to the question before, if it is still kept.
+        start(), stop(): Start and stop preparing questions ahead.
+    """
+    def __init__(self, questions, prepare, ahead=PREFETCH, behind=KEEP_BEHIND):
+        """
+        Args:
+            questions (iterator): The questions to show, read only by the window's thread.
+            prepare (function): Turns an item from questions into what the scene shows,
+                e.g. a Prepared. Runs on the window's thread.
+            ahead (int): How many questions to prepare ahead of the current one.
+            behind (int): How many questions to keep after moving on from them.
+        """
+        self._questions = questions
+        self._prepare = prepare
+        self.ahead = ahead
+        self.behind = behind
+        self.stalls = 0
+        self._ready = deque()
+        self._past = deque(maxlen=behind)
+        self._current = None
+        self._condition = threading.Condition()
+        self._running = False
+        self._finished = False
+        self._error = None
+        self._thread = None
+        self.start()
+
+    def start(self):
+        with self._condition:
+            if self._running or self._finished:
+                return
+            self._running = True
+        self._thread = threading.Thread(target=self._run, name="question-prefetch", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stops preparing questions, waiting for the one being prepared."""
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _next(self):
+        try:
+            return self._prepare(next(self._questions))
+        except StopIteration:
+            return None
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._running and len(self._ready) >= self.ahead:
+                    self._condition.wait()
+                if not self._running:
+                    return
+            try:
+                entry = self._next()
+            except Exception as e:
+                # Raised again on the scene's thread when it asks for the question
+                with self._condition:
+                    self._error = e
+                    self._running = False
+                    self._condition.notify_all()
+                return
+            with self._condition:
+                if entry is None:
+                    self._finished = True
+                    self._running = False
+                else:
+                    self._ready.append(entry)
+                self._condition.notify_all()
+                if entry is None:
+                    return
+
+    @property
+    def current(self):
+        if self._current is None:
+            self.advance()
+        return self._current
+
+    def advance(self):
+        """
+        Moves on to the next question, which is normally prepared already.
+        Returns:
+            The prepared question.
+        Raises:
+            StopIteration: If there are no more questions.
+        """
+        with self._condition:
+            if not self._ready and self._running:
+                if self._current is not None:
+                    self.stalls += 1
+                while not self._ready and self._running:
+                    self._condition.wait()
+            if self._ready:
+                self._move_to(self._ready.popleft())
+                self._condition.notify_all()
+                return self._current
+            if self._error is not None:
+                error, self._error = self._error, None
+                raise error
+            if self._finished:
+                raise StopIteration
+        # Stopped, so the thread is not using the fonts and the question can be prepared here
+        entry = self._next()
+        if entry is None:
+            self._finished = True
+            raise StopIteration
+        self._move_to(entry)
+        return entry
+
+    def _move_to(self, entry):
+        if self._current is not None and self.behind:
+            self._past.append(self._current)
+        self._current = entry
+
+    def back(self):
+        """
+        Moves back to the question shown before the current one. The current one
+        goes back in front of the prepared questions, so advance() returns to it.
+        Returns:
+            The prepared question, or None if it is no longer kept.
+        """
+        with self._condition:
+            if not self._past:
+                return None
+            self._ready.appendleft(self._current)
+            self._current = self._past.pop()
+            return self._current
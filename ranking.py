@@ -0,0 +1,80 @@
+"""
+Incrementally updated player ranking.
+
+Players are kept in a list sorted by score (best first, ties broken by name,
+the same order the score store uses), alongside a dict of each player's
+score. A score update moves one player with two binary searches instead of
+sorting everyone again, and top-N, page and rank queries are answered by
+binary search and slicing.
+
+Classes:
+    Ranking: The sorted ranking of every player.
+"""
+from bisect import bisect_left, insort
+
+
+class Ranking:
+    """
+    The sorted ranking of every player.
+
+    Methods:
+        update(username, score): Sets a player's score and moves them to their new place.
+        top(n): The n best players.
+        page(k, size): The k-th page of the ranking.
+        rank(username): A player's position, starting from 1.
+    """
+    def __init__(self, entries=()):
+        self._scores = dict(entries)
+        # Negated scores so the list sorts best first
+        self._order = sorted((-score, username) for username, score in self._scores.items())
+
+    def __len__(self):
+        return len(self._order)
+
+    def update(self, username, score):
+        """
+        Sets a player's score and moves them to their new place.
+        Args:
+            username (str): The player.
+            score (int): The player's new score.
+        """
+        old = self._scores.get(username)
+        if old == score:
+            return
+        if old is not None:
+            del self._order[bisect_left(self._order, (-old, username))]
+        self._scores[username] = score
+        insort(self._order, (-score, username))
+
+    def top(self, n):
+        """
+        Returns:
+            list[tuple]: Up to n (player name, score) tuples, best first.
+        """
+        return [(username, -score) for score, username in self._order[:n]]
+
+    def page(self, k, size):
+        """
+        Returns one page of the ranking.
+        Args:
+            k (int): The page number, starting from 0.
+            size (int): The number of players per page.
+        Returns:
+            list[tuple]: (rank, player name, score) tuples for the page.
+        """
+        start = k * size
+        return [(start + i + 1, username, -score)
+                for i, (score, username) in enumerate(self._order[start:start + size])]
+
+    def page_count(self, size):
+        return max(1, -(-len(self._order) // size))
+
+    def rank(self, username):
+        """
+        Returns:
+            int: The player's position, starting from 1, or None if they have no score.
+        """
+        score = self._scores.get(username)
+        if score is None:
+            return None
+        return bisect_left(self._order, (-score, username)) + 1
@@ -0,0 +1,357 @@
+"""
+Input recorder and replayer.
+
+The recorder captures every frame of a real session, with the events that
+arrived in it and when, into a compact binary file. The replayer feeds that
+file back into the game at the original speed or as fast as possible, and
+times each frame, so a slow session reported by a teacher can be reproduced
+and the frame costs before and after a change compared on exactly the same
+input.
+
+Both stand in for the scene manager's FrameScheduler, which is the game loop's
+only source of events. They also take over the manager's clock, which only
+moves between frames, and fix the seed for generated questions, so timed
+screens behave the same in a replay as they did in the recording.
+
+Replays run in a scratch copy of the game's data files (questions, roster,
+saves and scores), so replaying never changes the real saves or scores. The
+recorded user's saved positions are put back into the copy first.
+
+File format (little-endian):
+    b'LQREPLAY', version (u16), header length (u32), header (JSON)
+    then per frame: microseconds since the previous frame (u32), event count (u16), events
+    each event: type code (u8) followed by its fields; events the game does not use are dropped
+
+Usage:
+    python replay.py record session.lqr [screen] [--user NAME]
+    python replay.py play session.lqr [--fast] [--headless] [--screen NAME] [--output results.json]
+
+Classes:
+    Recorder: Records the events of a session while passing them on to the game.
+    Replayer: Plays a recording back into the game.
+"""
+import argparse
+import json
+import os
+import random
+import struct
+import sys
+import tempfile
+import time
+
+import scratch_data
+
+MAGIC = b'LQREPLAY'
+VERSION = 1
+_PREAMBLE = struct.Struct('<8sHI')
+_FRAME = struct.Struct('<IH')
+# Longest gap between two frames that can be stored, in microseconds
+MAX_GAP = 2 ** 32 - 1
+
+SCREENS = {
+    'login': ('Sign_in', 'LoginScene'),
+    'landing': ('landingPage', 'LandingScene'),
+    'training': ('trainingmode', 'TrainingScene'),
+    'lightning': ('lightningmode', 'LightningScene'),
+    'construction': ('constructionmode', 'ConstructionScene'),
+    'instructor': ('instructorMode', 'InstructorScene'),
+    'leaderboard': ('Leaderboard', 'LeaderboardScene'),
+}
+
+
+def load_screen(name):
+    """
+    Returns:
+        type: The Scene class for a screen name in SCREENS.
+    """
+    module_name, class_name = SCREENS[name]
+    module = __import__(module_name)
+    return getattr(module, class_name)
+
+
+def _codecs():
+    # Imported lazily so the video driver can be chosen before pygame is
+    import pygame
+
+    def text(event, attr):
+        data = getattr(event, attr, '').encode('utf-8')[:255]
+        return struct.pack('<B', len(data)) + data
+
+    def read_text(data, offset):
+        length = data[offset]
+        return data[offset + 1:offset + 1 + length].decode('utf-8', 'replace'), offset + 1 + length
+
+    def key_encode(event):
+        return struct.pack('<iHH', event.key, event.mod, getattr(event, 'scancode', 0)) + text(event, 'unicode')
+
+    def key_decode(kind, data, offset):
+        key, mod, scancode = struct.unpack_from('<iHH', data, offset)
+        unicode, offset = read_text(data, offset + 8)
+        return pygame.event.Event(kind, key=key, mod=mod, scancode=scancode, unicode=unicode), offset
+
+    def fields(fmt, encode, decode):
+        packer = struct.Struct(fmt)
+
+        def unpack(kind, data, offset):
+            return pygame.event.Event(kind, **decode(packer.unpack_from(data, offset))), offset + packer.size
+        return (lambda event: packer.pack(*encode(event))), unpack
+
+    motion = fields('<hhhhBBB', lambda e: (*e.pos, *e.rel, *e.buttons),
+                    lambda v: {'pos': v[0:2], 'rel': v[2:4], 'buttons': v[4:7]})
+    button = fields('<hhB', lambda e: (*e.pos, e.button), lambda v: {'pos': v[0:2], 'button': v[2]})
+    wheel = fields('<hhB', lambda e: (e.x, e.y, getattr(e, 'flipped', False)),
+                   lambda v: {'x': v[0], 'y': v[1], 'flipped': bool(v[2])})
+    resize = fields('<HH', lambda e: e.size, lambda v: {'size': v, 'w': v[0], 'h': v[1]})
+    quit_ = fields('<', lambda e: (), lambda v: {})
+    text_input = ((lambda e: text(e, 'text')),
+                  lambda kind, data, offset: (lambda t: (pygame.event.Event(kind, text=t[0]), t[1]))(
+                      read_text(data, offset)))
+
+    # code: (event type, encode, decode)
+    return {
+        1: (pygame.MOUSEMOTION, *motion),
+        2: (pygame.MOUSEBUTTONDOWN, *button),
+        3: (pygame.MOUSEBUTTONUP, *button),
+        4: (pygame.MOUSEWHEEL, *wheel),
+        5: (pygame.KEYDOWN, key_encode, key_decode),
+        6: (pygame.KEYUP, key_encode, key_decode),
+        7: (pygame.VIDEORESIZE, *resize),
+        8: (pygame.QUIT, *quit_),
+        9: (pygame.TEXTINPUT, *text_input),
+    }
+
+
+class Recorder:
+    """
+    Records the events of a session while passing them on to the game.
+
+    Methods:
+        next_events(fps, active): Gets the frame's events from the wrapped scheduler and records them.
+        clock(): The time of the current frame, in seconds since recording started.
+        close(): Finishes the file.
+    """
+    def __init__(self, manager, path, screen):
+        self.scheduler = manager.scheduler
+        self.file = open(path, 'wb')
+        self._codes = {kind: (code, encode) for code, (kind, encode, _) in _codecs().items()}
+        self._last = time.monotonic()
+        self._now_us = 0
+
+        manager.seed = random.randrange(2 ** 32)
+        header = {
+            'screen': screen,
+            'size': [manager.width, manager.height],
+            'username': manager.username,
+            'is_instructor': manager.is_instructor,
+            'seed': manager.seed,
+            'saves': _saved_positions(manager.username),
+            'recorded_at': time.time(),
+        }
+        data = json.dumps(header).encode('utf-8')
+        self.file.write(_PREAMBLE.pack(MAGIC, VERSION, len(data)) + data)
+
+        manager.scheduler = self
+        manager.clock = self.clock
+
+    def clock(self):
+        return self._now_us / 1e6
+
+    def next_events(self, fps, active):
+        events = self.scheduler.next_events(fps, active)
+        now = time.monotonic()
+        gap = min(MAX_GAP, round((now - self._last) * 1e6))
+        self._last = now
+        self._now_us += gap
+
+        encoded = []
+        for event in events:
+            codec = self._codes.get(event.type)
+            if codec is not None:
+                encoded.append(struct.pack('<B', codec[0]) + codec[1](event))
+        self.file.write(_FRAME.pack(gap, len(encoded)) + b''.join(encoded))
+        return events
+
+    def stats(self):
+        return self.scheduler.stats()
+
+    def close(self):
+        self.file.close()
+
+
+class Replayer:
+    """
+    Plays a recording back into the game, one recorded frame per game frame.
+
+    Attributes:
+        header (dict): What was recorded about the session.
+        realtime (bool): Wait for each frame's original time instead of running as fast as possible.
+        frame_times (list[float]): The time each replayed frame took the game, in seconds.
+
+    Methods:
+        install(manager): Makes the manager take its events, clock and seed from the replay.
+        next_events(fps, active): The next recorded frame's events.
+        clock(): The recorded time of the current frame.
+    """
+    def __init__(self, path, realtime=True):
+        with open(path, 'rb') as f:
+            self.data = f.read()
+        magic, version, length = _PREAMBLE.unpack_from(self.data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} replay file")
+        self.header = json.loads(self.data[_PREAMBLE.size:_PREAMBLE.size + length])
+        self.offset = _PREAMBLE.size + length
+        self.realtime = realtime
+        self.frame_times = []
+        self._codecs = _codecs()
+        self._now_us = 0
+        self._started = None
+        self._frame_start = None
+
+    def install(self, manager):
+        manager.scheduler = self
+        manager.clock = self.clock
+        manager.seed = self.header['seed']
+        manager.username = self.header['username']
+        manager.is_instructor = self.header['is_instructor']
+
+    def clock(self):
+        return self._now_us / 1e6
+
+    def _read_frame(self):
+        if self.offset >= len(self.data):
+            return None
+        gap, count = _FRAME.unpack_from(self.data, self.offset)
+        self.offset += _FRAME.size
+        events = []
+        for _ in range(count):
+            kind, _, decode = self._codecs[self.data[self.offset]]
+            event, self.offset = decode(kind, self.data, self.offset + 1)
+            events.append(event)
+        return gap, events
+
+    def next_events(self, fps, active):
+        import pygame
+
+        end = time.perf_counter()
+        if self._frame_start is not None:
+            self.frame_times.append(end - self._frame_start)
+        else:
+            self._started = end
+
+        # Only recorded input reaches the game
+        pygame.event.get()
+        frame = self._read_frame()
+        if frame is None:
+            events = [pygame.event.Event(pygame.QUIT)]
+        else:
+            gap, events = frame
+            self._now_us += gap
+            if self.realtime:
+                delay = self._started + self._now_us / 1e6 - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+        self._frame_start = time.perf_counter()
+        return events
+
+    def stats(self):
+        """
+        Returns:
+            dict: 'frames', 'seconds' the game spent on them, 'fps' and frame time percentiles in milliseconds.
+        """
+        times = sorted(self.frame_times) or [0.0]
+        busy = sum(self.frame_times)
+
+        def percentile(fraction):
+            return round(times[min(len(times) - 1, int(fraction * len(times)))] * 1000, 3)
+        return {
+            'frames': len(self.frame_times),
+            'seconds': round(busy, 4),
+            'fps': round(len(self.frame_times) / busy, 1) if busy else 0.0,
+            'frame_ms': {'p50': percentile(0.5), 'p90': percentile(0.9), 'p99': percentile(0.99),
+                         'max': round(times[-1] * 1000, 3)},
+        }
+
+
+def _saved_positions(username):
+    # The user's saved questions, so a replay starts from the same place
+    if not username or not os.path.exists('saves.db'):
+        return {}
+    import save_store
+    rows = save_store.default_store().conn.execute(
+        "SELECT mode, question_index FROM saves WHERE username = ?", (username,)).fetchall()
+    return dict(rows)
+
+
+def record(path, screen, username=None):
+    from scene_manager import SceneManager
+
+    manager = SceneManager()
+    if username is not None:
+        manager.username = username
+    recorder = Recorder(manager, path, screen)
+    try:
+        manager.run(load_screen(screen)(manager))
+    finally:
+        recorder.close()
+    print(f"Recorded to {path}")
+
+
+def play(path, realtime=True, screen=None):
+    """
+    Replays a recording in a scratch copy of the game's data.
+    Args:
+        path (str): The recording.
+        realtime (bool): Keep the original timing instead of running as fast as possible.
+        screen (str): Start on this screen instead of the recorded one.
+    Returns:
+        dict: The replay's frame statistics.
+    """
+    path = os.path.abspath(path)
+    replayer = Replayer(path, realtime)
+    source = os.path.dirname(os.path.abspath(__file__))
+    with tempfile.TemporaryDirectory(prefix='logic-quest-replay-') as scratch:
+        scratch_data.prepare_directory(source, scratch, replayer.header)
+        os.chdir(scratch)
+        try:
+            from scene_manager import SceneManager
+
+            manager = SceneManager(tuple(replayer.header['size']))
+            replayer.install(manager)
+            manager.run(load_screen(screen or replayer.header['screen'])(manager))
+        finally:
+            os.chdir(source)
+    return replayer.stats()
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Record and replay game sessions.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    record_parser = commands.add_parser('record', help="play the game and record the input")
+    record_parser.add_argument('path')
+    record_parser.add_argument('screen', nargs='?', default='login', choices=sorted(SCREENS))
+    record_parser.add_argument('--user', help="play as this user instead of the last one logged in")
+    play_parser = commands.add_parser('play', help="replay a recording and time it")
+    play_parser.add_argument('path')
+    play_parser.add_argument('--fast', action='store_true', help="run as fast as possible")
+    play_parser.add_argument('--headless', action='store_true', help="use SDL's dummy video driver")
+    play_parser.add_argument('--screen', choices=sorted(SCREENS), help="start on this screen")
+    play_parser.add_argument('--output', help="write the frame statistics to this JSON file")
+    args = parser.parse_args(argv)
+
+    if args.command == 'record':
+        record(args.path, args.screen, args.user)
+        return
+
+    if args.headless:
+        os.environ['SDL_VIDEODRIVER'] = 'dummy'
+        os.environ['SDL_AUDIODRIVER'] = 'dummy'
+    stats = play(args.path, realtime=not args.fast, screen=args.screen)
+    print(f"{stats['frames']} frames in {stats['seconds']:.3f} s of game time ({stats['fps']:,.0f} fps), "
+          f"frame ms p50 {stats['frame_ms']['p50']}, p99 {stats['frame_ms']['p99']}, max {stats['frame_ms']['max']}")
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(stats, f, indent=2)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
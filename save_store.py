@@ -0,0 +1,191 @@
+"""
+Save store for resuming a game where each player left off.
+
+Every player's save is one row of an SQLite table keyed by username and mode,
+holding the question they were on and when it was saved, so loading or saving
+it is a single primary key lookup however many players there are. Each answer
+a player gives is kept in a history table next to it.
+
+The history only keeps the latest HISTORY_LIMIT answers per player and mode.
+Recording an answer drops that player's oldest one in the same transaction
+once they have more, so the file stops growing however long it is used.
+Opening the store also compacts it, and the database uses incremental
+auto-vacuum so the pages freed are handed back to the file system.
+
+The first time the store is opened, the last position of each player in the old
+progress.txt (both the name/index line pairs and the name:level lines) is imported.
+
+Classes:
+    SaveState: A player's saved position in one mode.
+    SaveStore: The per-player save table.
+
+Functions:
+    default_store(): The store shared by every scene in the process.
+"""
+import os
+import time
+from collections import namedtuple
+
+import persistence
+
+DB_FILE = 'saves.db'
+LEGACY_FILE = 'progress.txt'
+
+# Bumped when the schema changes; also marks that progress.txt has been imported
+SCHEMA_VERSION = 1
+# How many answers are kept per player and mode
+HISTORY_LIMIT = 200
+
+SaveState = namedtuple('SaveState', ['username', 'mode', 'question_index', 'updated_at'])
+
+
+def parse_legacy_progress(text):
+    """
+    Reads the last saved position of each player from the old progress.txt,
+    skipping anything that is in neither of its formats.
+    Args:
+        text (str): The contents of progress.txt.
+    Returns:
+        dict: Player name -> question index.
+    """
+    progress = {}
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        # The old pause menu wrote "name:level"
+        name, sep, level = line.rpartition(':')
+        if sep and name and level.isdigit():
+            progress[name] = int(level)
+            i += 1
+        # saveGame appended the name, then the index on its own line
+        elif not line.isdigit() and i + 1 < len(lines) and lines[i + 1].isdigit():
+            progress[line] = int(lines[i + 1])
+            i += 2
+        else:
+            i += 1
+    return progress
+
+
+class SaveStore:
+    """
+    The per-player save table.
+
+    Methods:
+        load(username, mode): The player's save, or None.
+        save(username, mode, question_index): Saves the player's position.
+        record_answer(username, mode, question_index, answer, correct): Adds an answer to the history.
+        history(username, mode, limit): The player's latest answers.
+        compact(): Prunes old answers and returns their space to the file system.
+    """
+    def __init__(self, path=DB_FILE, legacy_path=LEGACY_FILE):
+        self.path = path
+        self.conn = persistence.connect(path)
+        # auto_vacuum only takes effect if it is set before the first table is created
+        self.conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        with self.conn:
+            self.conn.execute("CREATE TABLE IF NOT EXISTS saves ("
+                              "username TEXT NOT NULL, mode TEXT NOT NULL, question_index INTEGER NOT NULL, "
+                              "updated_at REAL NOT NULL, PRIMARY KEY (username, mode))")
+            self.conn.execute("CREATE TABLE IF NOT EXISTS answers ("
+                              "username TEXT NOT NULL, mode TEXT NOT NULL, question_index INTEGER NOT NULL, "
+                              "answer TEXT NOT NULL, correct INTEGER NOT NULL, answered_at REAL NOT NULL)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS answers_by_user "
+                              "ON answers (username, mode, answered_at DESC)")
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+            self._import_legacy(legacy_path)
+        # Catches up on files written before answers were pruned as they were recorded
+        self.compact()
+
+    def _import_legacy(self, legacy_path):
+        progress = {}
+        if legacy_path and os.path.exists(legacy_path):
+            progress = parse_legacy_progress(persistence.read_text(legacy_path))
+        now = time.time()
+        with self.conn:
+            # Existing saves win over the legacy file
+            self.conn.executemany("INSERT OR IGNORE INTO saves VALUES (?, 'training', ?, ?)",
+                                  [(name, index, now) for name, index in progress.items()])
+            self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def load(self, username, mode):
+        """
+        Returns:
+            SaveState: The player's save in the mode, or None if they have not saved.
+        """
+        row = self.conn.execute("SELECT username, mode, question_index, updated_at FROM saves "
+                                "WHERE username = ? AND mode = ?", (username, mode)).fetchone()
+        return SaveState(*row) if row else None
+
+    def save(self, username, mode, question_index):
+        """
+        Saves the player's position in a mode, replacing their previous save.
+        Args:
+            username (str): The player.
+            mode (str): The game mode, e.g. 'training'.
+            question_index (int): The question they are on.
+        """
+        with self.conn:
+            self.conn.execute("INSERT INTO saves VALUES (?, ?, ?, ?) "
+                              "ON CONFLICT (username, mode) DO UPDATE SET "
+                              "question_index = excluded.question_index, updated_at = excluded.updated_at",
+                              (username, mode, question_index, time.time()))
+
+    def record_answer(self, username, mode, question_index, answer, correct):
+        """
+        Adds an answer to the player's history.
+        Args:
+            username (str): The player.
+            mode (str): The game mode.
+            question_index (int): The question answered.
+            answer (str): The option they chose.
+            correct (bool): Whether it was right.
+        """
+        with self.conn:
+            self.conn.execute("INSERT INTO answers VALUES (?, ?, ?, ?, ?, ?)",
+                              (username, mode, question_index, answer, int(correct), time.time()))
+            # Only this player's history can have gone over the limit
+            self.conn.execute("DELETE FROM answers WHERE username = ? AND mode = ? AND rowid NOT IN ("
+                              "SELECT rowid FROM answers WHERE username = ? AND mode = ? "
+                              "ORDER BY answered_at DESC LIMIT ?)",
+                              (username, mode, username, mode, HISTORY_LIMIT))
+
+    def history(self, username, mode, limit=HISTORY_LIMIT):
+        """
+        Returns:
+            list[tuple]: Up to limit (question index, answer, correct, answered at) tuples, newest first.
+        """
+        rows = self.conn.execute("SELECT question_index, answer, correct, answered_at FROM answers "
+                                 "WHERE username = ? AND mode = ? ORDER BY answered_at DESC LIMIT ?",
+                                 (username, mode, limit)).fetchall()
+        return [(index, answer, bool(correct), answered_at) for index, answer, correct, answered_at in rows]
+
+    def compact(self):
+        """
+        Drops all but the latest HISTORY_LIMIT answers of every player and mode,
+        then returns the freed pages to the file system.
+        """
+        with self.conn:
+            self.conn.execute("DELETE FROM answers WHERE rowid IN ("
+                              "SELECT rowid FROM (SELECT rowid, ROW_NUMBER() OVER ("
+                              "PARTITION BY username, mode ORDER BY answered_at DESC) AS n FROM answers) "
+                              "WHERE n > ?)", (HISTORY_LIMIT,))
+        # executescript runs the pragma to completion; execute() would free a single page
+        self.conn.executescript("PRAGMA incremental_vacuum")
+
+    def close(self):
+        self.conn.close()
+
+
+_default = None
+
+
+def default_store():
+    """
+    Returns:
+        SaveStore: The store shared by every scene in the process, opened on first use.
+    """
+    global _default
+    if _default is None:
+        _default = SaveStore()
+    return _default
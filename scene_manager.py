@@ -0,0 +1,316 @@
+"""
+Scene manager for Logic Quest.
+
+All screens of the game (login, landing page, training, lightning, instructor,
+leaderboard and pause) are scenes that run inside a single process and share a
+single window. Switching screens pushes, pops or replaces scenes on a stack
+instead of starting a new Python interpreter, so pausing and resuming keeps the
+paused scene exactly as it was and memory stays flat.
+
+Classes:
+    Scene: Base class for every screen of the game.
+    SceneManager: Owns the display and the scene stack and runs the main loop.
+
+Functions:
+    run(scene_cls): Runs the game starting from the given scene.
+"""
+import os
+import sys
+import time
+
+import pygame
+
+import persistence
+from dirty_rects import DirtyRegion
+from frame_scheduler import FrameScheduler
+from profiler import FrameProfiler
+
+DEFAULT_SIZE = (1000, 800)
+
+
+class Scene:
+    """
+    Base class for a screen of the game.
+
+    Attributes:
+        manager (SceneManager): The manager running this scene.
+        size (tuple): The window size the scene is laid out for.
+        caption (str): The window caption shown while the scene is on top.
+        fps (int): The frame rate cap while the scene is on top.
+        tracks_dirty (bool): Whether the scene marks what changed in self.dirty.
+            Scenes that do not are redrawn completely every frame.
+        dirty (DirtyRegion): The areas to redraw on the next frame.
+
+    Methods:
+        handle_event(event): Handles a single pygame event.
+        update(): Advances the scene by one frame.
+        draw(win): Draws the scene on the specified window.
+        on_enter(): Called when the scene becomes the top of the stack.
+        on_leave(): Called when another scene covers or replaces this one.
+        on_resize(width, height): Lays the scene out again for a new window size.
+        is_active(): Whether the scene is animating and needs frames without input.
+    """
+    caption = "Logic Quest"
+    fps = 60
+    tracks_dirty = False
+
+    def __init__(self, manager):
+        self.manager = manager
+        self.size = (manager.width, manager.height)
+        self.dirty = DirtyRegion()
+
+    def handle_event(self, event):
+        pass
+
+    def update(self):
+        pass
+
+    def draw(self, win):
+        pass
+
+    def on_enter(self):
+        pass
+
+    def on_leave(self):
+        pass
+
+    def on_resize(self, width, height):
+        pass
+
+    def is_active(self):
+        return False
+
+
+class SceneManager:
+    """
+    Owns the game window and a stack of scenes. Only the top scene receives
+    events and is drawn. Stack changes requested while a frame is running are
+    applied at the start of the next frame, so a scene can safely pop itself
+    from inside its own event handler or draw call.
+
+    When the window is resized (or F11 toggles fullscreen), the top scene is
+    laid out again once for the new size, however many resize events arrived in
+    the frame. Covered scenes are laid out again when they are back on top.
+
+    Attributes:
+        display (pygame.Surface): The one window shared by every scene.
+        width, height (int): The size of the window.
+        scheduler (FrameScheduler): Sleeps between frames while the scene is static. It is the
+            loop's only source of events and can be swapped for anything with the same
+            next_events(fps, active) method, e.g. a recorder or a replay (see replay.py).
+        clock (function): The time in seconds that timed scenes read; time.monotonic by default.
+        seed (int): Seed for generated questions, or None for a different sequence every time.
+        profiler (FrameProfiler): The frame timing overlay, shown with F3; F4 saves recent stacks.
+        username (str): The user currently logged in.
+        is_instructor (bool): Whether the user logged in with an instructor key.
+        dirty_rects (bool): Whether to redraw only the areas scenes mark as dirty.
+        fullscreen (bool): Whether the window is fullscreen.
+    """
+    def __init__(self, size=None, dirty_rects=True):
+        pygame.init()
+
+        if size is None:
+            screen_info = pygame.display.Info()
+            size = (screen_info.current_w, screen_info.current_h)
+            if size[0] <= 0 or size[1] <= 0:
+                size = DEFAULT_SIZE
+
+        self.width, self.height = size
+        self.display = pygame.display.set_mode(size, pygame.RESIZABLE)
+        self.fullscreen = False
+        self.windowed_size = size
+        self.scheduler = FrameScheduler()
+        self.clock = time.monotonic
+        self.seed = None
+        self.profiler = FrameProfiler()
+
+        self.username = ''
+        if os.path.exists('cur_username.txt'):
+            with open('cur_username.txt', 'r') as f:
+                self.username = f.read().strip()
+        self.is_instructor = False
+        self.dirty_rects = dirty_rects
+
+        self.stack = []
+        self._pending = []
+        self.running = False
+
+    @property
+    def top(self):
+        return self.stack[-1] if self.stack else None
+
+    def push(self, scene):
+        """Puts a scene on top of the current one."""
+        self._pending.append(('push', scene))
+
+    def pop(self):
+        """Removes the top scene and returns to the one below it."""
+        self._pending.append(('pop', None))
+
+    def replace(self, scene):
+        """Replaces the top scene with another one."""
+        self._pending.append(('replace', scene))
+
+    def exit_to_menu(self):
+        """Clears the stack and goes back to the landing page."""
+        from landingPage import LandingScene
+        self._pending.append(('clear', None))
+        self._pending.append(('push', LandingScene(self)))
+
+    def quit(self):
+        self.running = False
+
+    def resize(self, size):
+        """
+        Takes on a new window size and lays the top scene out for it.
+        Args:
+            size (tuple): The new (width, height) of the window.
+        """
+        self.width, self.height = size
+        # A resizable window's surface is resized by pygame itself
+        self.display = pygame.display.get_surface()
+        self._fit(self.top)
+
+    def toggle_fullscreen(self):
+        if self.fullscreen:
+            self.display = pygame.display.set_mode(self.windowed_size, pygame.RESIZABLE)
+        else:
+            self.windowed_size = (self.width, self.height)
+            self.display = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
+        self.fullscreen = not self.fullscreen
+        self.resize(self.display.get_size())
+
+    def _fit(self, scene):
+        # Lays a scene out again if the window changed size since it was last laid out
+        size = (self.width, self.height)
+        if scene is not None and scene.size != size:
+            scene.size = size
+            scene.on_resize(*size)
+            scene.dirty.invalidate()
+
+    def _apply_pending(self):
+        while self._pending:
+            action, scene = self._pending.pop(0)
+            previous = self.top
+            if previous is not None and action != 'clear':
+                previous.on_leave()
+            if action == 'push':
+                self.stack.append(scene)
+            elif action == 'pop':
+                self.stack.pop()
+            elif action == 'replace':
+                if self.stack:
+                    self.stack.pop()
+                self.stack.append(scene)
+            elif action == 'clear':
+                while self.stack:
+                    self.stack.pop().on_leave()
+            if self.top is not None and self.top is not previous:
+                pygame.display.set_caption(self.top.caption)
+                self._fit(self.top)
+                self.top.dirty.invalidate()
+                self.top.on_enter()
+
+    def run(self, scene=None):
+        """
+        Runs the main loop until the stack is empty or the window is closed.
+        Args:
+            scene (Scene): Optional first scene to push.
+        """
+        if scene is not None:
+            self.push(scene)
+        self.running = True
+        events = []
+        while self.running:
+            self._apply_pending()
+            scene = self.top
+            if scene is None:
+                break
+
+            self.profiler.start()
+            new_size = None
+            for event in events:
+                if event.type == pygame.QUIT:
+                    self.running = False
+                    break
+                if event.type == pygame.VIDEORESIZE:
+                    # Only the last size of the frame matters
+                    new_size = event.size
+                    continue
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_F11:
+                    self.toggle_fullscreen()
+                    continue
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                    self.profiler.toggle()
+                    # Take the overlay off the screen, or make room for it
+                    scene.dirty.invalidate()
+                    continue
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_F4 and self.profiler.enabled:
+                    self.profiler.dump()
+                    continue
+                scene.handle_event(event)
+            if not self.running:
+                break
+            if new_size is not None and new_size != (self.width, self.height):
+                self.resize(new_size)
+            self.profiler.lap('events')
+
+            scene.update()
+            self.profiler.lap('update')
+            self.draw(scene)
+            self.profiler.end()
+            # Writes wait for a batched sync; idle frames still come every idle timeout
+            persistence.sync_due()
+            # Don't sleep when a scene change is waiting to be shown
+            active = scene.is_active() or bool(self._pending)
+            events = self.scheduler.next_events(scene.fps, active)
+
+    def draw(self, scene):
+        """
+        Draws the scene and updates the display, limited to its dirty areas when it tracks them.
+        """
+        profiler = self.profiler
+        if not (self.dirty_rects and scene.tracks_dirty):
+            rects = None
+            scene.draw(self.display)
+        else:
+            if profiler.enabled:
+                # The overlay changes every frame, so the scene under it is redrawn too
+                scene.dirty.add(profiler.rect)
+            rects = scene.dirty.flush()
+            if rects is None:
+                scene.draw(self.display)
+            elif rects:
+                # Drawing is clipped to each dirty area, so only those pixels are touched
+                for rect in rects:
+                    self.display.set_clip(rect)
+                    scene.draw(self.display)
+                self.display.set_clip(None)
+            else:
+                profiler.lap('draw')
+                return
+        profiler.lap('draw')
+
+        if profiler.enabled:
+            overlay = profiler.draw(self.display)
+            if rects is not None:
+                rects.append(overlay)
+        if rects is None:
+            pygame.display.update()
+        else:
+            pygame.display.update(rects)
+        profiler.lap('display')
+
+
+def run(scene_cls):
+    """
+    Runs the game starting from the given scene and exits when it is closed.
+    Args:
+        scene_cls (type): The Scene subclass to start with.
+    """
+    manager = SceneManager()
+    manager.run(scene_cls(manager))
+    stats = manager.scheduler.stats()
+    print(f"Average frame time {stats['frame_ms']:.2f} ms, idle {stats['idle_share']:.0%} of the time")
+    pygame.quit()
+    sys.exit()
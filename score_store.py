@@ -0,0 +1,140 @@
+"""
+Score store for Lightning Mode high scores.
+
+High scores are kept in an SQLite table keyed by username, with an index on the
+score. Recording a personal best is a single indexed upsert and reading the top
+k players walks k entries of the index, so neither depends on how many players
+there are. Every write is its own transaction, so a crash never leaves a half
+written file behind, and copies of the game sharing the database wait for each
+other's writes instead of failing.
+
+The first time the store is opened, any scores in the old scores.txt format
+(a username line followed by a score line) are imported.
+
+Classes:
+    ScoreStore: The high score table.
+
+Functions:
+    default_store(): The store shared by every scene in the process.
+"""
+import os
+
+import persistence
+from ranking import Ranking
+
+DB_FILE = 'scores.db'
+LEGACY_FILE = 'scores.txt'
+
+# Bumped when the schema changes; also marks that scores.txt has been imported
+SCHEMA_VERSION = 1
+
+
+class ScoreStore:
+    """
+    The high score table.
+
+    Methods:
+        record(username, score): Saves a score if it beats the user's best.
+        best(username): The user's best score.
+        top(k): The k best players.
+        ranking(): The full ranking, kept up to date as scores are recorded.
+    """
+    def __init__(self, path=DB_FILE, legacy_path=LEGACY_FILE):
+        self.path = path
+        self.conn = persistence.connect(path)
+        self._ranking = None
+        self._ranking_version = None
+        with self.conn:
+            self.conn.execute("CREATE TABLE IF NOT EXISTS scores ("
+                              "username TEXT PRIMARY KEY, score INTEGER NOT NULL)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS scores_by_score ON scores (score DESC, username)")
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+            self._import_legacy(legacy_path)
+
+    def _import_legacy(self, legacy_path):
+        players = []
+        if legacy_path and os.path.exists(legacy_path):
+            with open(legacy_path, 'r') as f:
+                lines = [line.strip() for line in f if line.strip()]  # This removes any empty lines
+            # Group lines into pairs (name, score)
+            it = iter(lines)
+            for name, score in zip(it, it):
+                try:
+                    players.append((name, int(score)))
+                except ValueError:
+                    print(f"Skipping bad score for {name} in {legacy_path}: {score!r}")
+        with self.conn:
+            for name, score in players:
+                self._upsert(name, score)
+            self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def _upsert(self, username, score):
+        cursor = self.conn.execute(
+            "INSERT INTO scores (username, score) VALUES (?, ?) "
+            "ON CONFLICT (username) DO UPDATE SET score = excluded.score "
+            "WHERE excluded.score > scores.score",
+            (username, score))
+        return cursor.rowcount > 0
+
+    def record(self, username, score):
+        """
+        Saves a score if it is the user's first or beats their best.
+        Args:
+            username (str): The player.
+            score (int): The round score.
+        Returns:
+            bool: True if the score was saved as the user's new best.
+        """
+        with self.conn:
+            improved = self._upsert(username, score)
+        if improved and self._ranking is not None:
+            self._ranking.update(username, self.best(username))
+        return improved
+
+    def best(self, username):
+        """
+        Returns:
+            int: The user's best score, or None if they have no score yet.
+        """
+        row = self.conn.execute("SELECT score FROM scores WHERE username = ?", (username,)).fetchone()
+        return row[0] if row else None
+
+    def top(self, k):
+        """
+        Returns:
+            list[tuple]: Up to k (player name, score) tuples, best first.
+        """
+        return self.conn.execute("SELECT username, score FROM scores ORDER BY score DESC, username LIMIT ?",
+                                 (k,)).fetchall()
+
+    def ranking(self):
+        """
+        Returns the ranking of every player. It is built from the table once and
+        then updated by record(); it is only rebuilt when another process has
+        written to the database since.
+        Returns:
+            Ranking: The ranking.
+        """
+        # data_version only changes when another connection commits
+        version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+        if self._ranking is None or version != self._ranking_version:
+            self._ranking = Ranking(self.conn.execute("SELECT username, score FROM scores"))
+            self._ranking_version = version
+        return self._ranking
+
+    def close(self):
+        self.conn.close()
+
+
+_default = None
+
+
+def default_store():
+    """
+    Returns:
+        ScoreStore: The store shared by every scene in the process, opened on first use.
+    """
+    global _default
+    if _default is None:
+        _default = ScoreStore()
+    return _default
@@ -0,0 +1,47 @@
+"""
+Scratch copies of the game's data files.
+
+The benchmark and the replayer run the game in a temporary directory holding
+copies of the question files, so they never change the real saves or scores.
+Both fill it with prepare_directory(), so they copy the same files.
+
+Functions:
+    prepare_directory(source, target, header): Fills a scratch directory with copies of the game's data.
+"""
+import os
+import shutil
+
+# The questions and images every screen needs, copied when they exist
+DATA_FILES = ('questions.txt', 'options.txt', 'answers.txt', 'difficulty.txt', 'questions.db', 'bg_offwhite.jpg')
+DATA_DIRS = ('backgrounds',)
+# The roster, keys, scores and saves, copied too when replaying a player's session
+PLAYER_FILES = ('usernames.txt', 'keys.txt', 'scores.db', 'saves.db')
+
+
+def prepare_directory(source, target, header=None):
+    """
+    Fills a scratch directory with copies of the game's data files.
+    Args:
+        source (str): The game's directory.
+        target (str): The scratch directory.
+        header (dict): A recording's header. If given, the players' files are copied
+            too, and the recorded user is logged in with their saved positions put back.
+    """
+    names = DATA_FILES if header is None else DATA_FILES + PLAYER_FILES
+    for name in names:
+        if os.path.exists(os.path.join(source, name)):
+            shutil.copy(os.path.join(source, name), target)
+    for name in DATA_DIRS:
+        if os.path.isdir(os.path.join(source, name)):
+            shutil.copytree(os.path.join(source, name), os.path.join(target, name))
+    if header is None:
+        return
+
+    with open(os.path.join(target, 'cur_username.txt'), 'w') as f:
+        f.write(header['username'])
+    if header['saves']:
+        import save_store
+        saves = save_store.SaveStore(os.path.join(target, save_store.DB_FILE), legacy_path=None)
+        for mode, index in header['saves'].items():
+            saves.save(header['username'], mode, index)
+        saves.close()
@@ -0,0 +1,94 @@
+"""
+Cache of rendered text surfaces.
+
+Rendering text rasterizes every glyph, which is by far the most expensive part
+of drawing most frames. Most labels never change from one frame to the next, so
+rendered surfaces are kept in a bounded LRU cache keyed by
+(font, text, color, antialias). Fonts come from the shared registry in assets.py,
+so the same font object, and therefore the same key, is used by every scene.
+
+Cached surfaces are shared between callers and must not be drawn on.
+
+Classes:
+    TextCache: A bounded LRU cache of rendered text surfaces.
+
+Functions:
+    render(font, text, color, antialias): Renders text through the shared cache.
+    stats(): Hit and miss counters of the shared cache.
+"""
+from collections import OrderedDict
+
+MAX_SURFACES = 512
+
+
+class TextCache:
+    """
+    A bounded LRU cache of rendered text surfaces.
+
+    Attributes:
+        maxsize (int): The most surfaces kept before the least recently used is dropped.
+        hits, misses (int): How many renders were served from the cache or rasterized.
+    """
+    def __init__(self, maxsize=MAX_SURFACES):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._surfaces = OrderedDict()
+
+    def render(self, font, text, color, antialias=True):
+        """
+        Returns the rendered text, rasterizing it only if it is not cached.
+        Args:
+            font (pygame.font.Font): The font to render with.
+            text (str): The text to render.
+            color (tuple or str): The text color.
+            antialias (bool): Whether to antialias the text.
+        Returns:
+            pygame.Surface: The rendered text.
+        """
+        if isinstance(color, list):
+            color = tuple(color)
+        key = (font, text, color, antialias)
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self._surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+        self._surfaces[key] = surface
+        if len(self._surfaces) > self.maxsize:
+            self._surfaces.popitem(last=False)
+        return surface
+
+    def stats(self):
+        """
+        Returns:
+            dict: The hits, misses, hit rate and number of cached surfaces.
+        """
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'size': len(self._surfaces),
+        }
+
+    def clear(self):
+        self._surfaces.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+cache = TextCache()
+
+
+def render(font, text, color, antialias=True):
+    """Renders text through the shared cache. See TextCache.render."""
+    return cache.render(font, text, color, antialias)
+
+
+def stats():
+    """Returns the hit and miss counters of the shared cache."""
+    return cache.stats()
@@ -0,0 +1,113 @@
+"""
+Wall-clock timers.
+
+Timers read a monotonic clock instead of counting frames, so a time limit lasts
+the same number of seconds however fast or slow the game loop runs, and the
+loop can draw at any frame rate without changing the rules.
+
+Classes:
+    Countdown: A pausable countdown.
+    RoundTimer: A per-question countdown combined with an optional per-round one.
+"""
+import time
+
+
+class Countdown:
+    """
+    A pausable countdown measured on a monotonic clock.
+
+    Attributes:
+        budget (float): The length of the countdown in seconds.
+        clock (function): Returns the current time in seconds; time.monotonic by default.
+
+    Methods:
+        start(): Starts or restarts the countdown from its full budget.
+        pause(): Stops the countdown until it is resumed.
+        resume(): Continues a paused countdown.
+        elapsed(): The seconds counted down so far.
+        remaining(): The seconds left, never below zero.
+        expired(): Whether the countdown has reached zero.
+    """
+    def __init__(self, budget, clock=time.monotonic):
+        self.budget = budget
+        self.clock = clock
+        self._started_at = None
+        self._paused_at = None
+        self._paused_for = 0.0
+
+    @property
+    def running(self):
+        return self._started_at is not None and self._paused_at is None
+
+    def start(self, budget=None):
+        if budget is not None:
+            self.budget = budget
+        self._started_at = self.clock()
+        self._paused_at = None
+        self._paused_for = 0.0
+
+    def pause(self):
+        if self.running:
+            self._paused_at = self.clock()
+
+    def resume(self):
+        if self._paused_at is not None:
+            self._paused_for += self.clock() - self._paused_at
+            self._paused_at = None
+
+    def elapsed(self):
+        if self._started_at is None:
+            return 0.0
+        now = self._paused_at if self._paused_at is not None else self.clock()
+        return now - self._started_at - self._paused_for
+
+    def remaining(self):
+        return max(0.0, self.budget - self.elapsed())
+
+    def expired(self):
+        return self._started_at is not None and self.elapsed() >= self.budget
+
+
+class RoundTimer:
+    """
+    Times a round made of questions: each question has its own budget, and the
+    round as a whole may have one too. The round is over when either runs out.
+
+    Attributes:
+        question (Countdown): The countdown for the current question.
+        round (Countdown): The countdown for the whole round, or None for no round limit.
+
+    Methods:
+        start(): Starts the round and its first question.
+        next_question(): Restarts the question countdown.
+        pause(), resume(): Pause and resume both countdowns.
+        remaining(): The seconds left before time is up.
+        expired(): Whether time is up.
+    """
+    def __init__(self, question_budget, round_budget=None, clock=time.monotonic):
+        self.question = Countdown(question_budget, clock)
+        self.round = Countdown(round_budget, clock) if round_budget is not None else None
+
+    def _countdowns(self):
+        return [self.question] if self.round is None else [self.question, self.round]
+
+    def start(self):
+        for countdown in self._countdowns():
+            countdown.start()
+
+    def next_question(self):
+        self.question.start()
+
+    def pause(self):
+        for countdown in self._countdowns():
+            countdown.pause()
+
+    def resume(self):
+        for countdown in self._countdowns():
+            countdown.resume()
+
+    def remaining(self):
+        return min(countdown.remaining() for countdown in self._countdowns())
+
+    def expired(self):
+        return any(countdown.expired() for countdown in self._countdowns())
@@ -0,0 +1,189 @@
+"""
+Vectorized truth tables for formulas parsed by logic.py.
+
+A formula over n variables has 2^n rows. The whole column of results is packed
+into an array of uint64 words, 64 rows per word, and every operator is applied
+to all rows at once with a single NumPy bitwise operation. Row r assigns True
+to variable i when bit i of r is set, so the first variable toggles fastest.
+
+Because AST nodes are interned, tables are cached per (formula, variables) and
+shared subformulas are only evaluated once.
+
+Functions:
+    variable_columns(n): The packed columns of n variables.
+    packed_truth_table(formula, variables): A formula's packed truth table.
+    truth_table(formula, variables): A formula's truth table as a bool array.
+    table_matrix(formulas, variables): The packed tables of many formulas, one row each.
+    equivalent(a, b): Checks whether two formulas are logically equivalent.
+    equivalence_classes(formulas): Groups formulas that are logically equivalent.
+"""
+from functools import lru_cache
+
+import numpy as np
+
+from logic import AND, IMPLIES, OR, Not, Var, parse
+
+ALL_ONES = np.uint64(0xFFFFFFFFFFFFFFFF)
+
+# The bit pattern of each of the first six variables inside a single 64 row word
+_WORD_PATTERNS = [
+    0xAAAAAAAAAAAAAAAA,
+    0xCCCCCCCCCCCCCCCC,
+    0xF0F0F0F0F0F0F0F0,
+    0xFF00FF00FF00FF00,
+    0xFFFF0000FFFF0000,
+    0xFFFFFFFF00000000,
+]
+
+
+def _as_formula(formula):
+    return parse(formula) if isinstance(formula, str) else formula
+
+
+def _row_mask(n):
+    # Only the low 2^n bits of the single word are used when there are fewer than 64 rows
+    if n >= 6:
+        return ALL_ONES
+    return np.uint64((1 << (1 << n)) - 1)
+
+
+@lru_cache(maxsize=32)
+def variable_columns(n):
+    """
+    Returns the packed columns of n variables.
+    Args:
+        n (int): The number of variables.
+    Returns:
+        numpy.ndarray: A read-only uint64 array of shape (n, words), where words is max(1, 2^n / 64).
+    """
+    words = max(1, (1 << n) // 64)
+    word_index = np.arange(words, dtype=np.uint64)
+    columns = np.empty((n, words), dtype=np.uint64)
+    for i in range(n):
+        if i < 6:
+            columns[i] = np.uint64(_WORD_PATTERNS[i]) & _row_mask(n)
+        else:
+            bit = (word_index >> np.uint64(i - 6)) & np.uint64(1)
+            columns[i] = np.where(bit == 1, ALL_ONES, np.uint64(0))
+    columns.setflags(write=False)
+    return columns
+
+
+def _evaluate(formula, columns, index, mask, memo):
+    table = memo.get(formula)
+    if table is not None:
+        return table
+    if isinstance(formula, Var):
+        table = columns[index[formula.name]]
+    elif isinstance(formula, Not):
+        table = ~_evaluate(formula.operand, columns, index, mask, memo) & mask
+    else:
+        left = _evaluate(formula.left, columns, index, mask, memo)
+        right = _evaluate(formula.right, columns, index, mask, memo)
+        if formula.op == AND:
+            table = left & right
+        elif formula.op == OR:
+            table = left | right
+        elif formula.op == IMPLIES:
+            table = (~left | right) & mask
+        else:
+            table = ~(left ^ right) & mask
+    memo[formula] = table
+    return table
+
+
+@lru_cache(maxsize=8192)
+def _packed_truth_table(formula, variables):
+    missing = formula.variables - set(variables)
+    if missing:
+        raise ValueError(f"no column for variables {sorted(missing)}")
+    n = len(variables)
+    index = {name: i for i, name in enumerate(variables)}
+    table = _evaluate(formula, variable_columns(n), index, _row_mask(n), {}).copy()
+    table.setflags(write=False)
+    return table
+
+
+def packed_truth_table(formula, variables=None):
+    """
+    Returns a formula's packed truth table.
+    Args:
+        formula (Formula or str): The formula.
+        variables (tuple): The variable order; defaults to the formula's variables sorted by name.
+    Returns:
+        numpy.ndarray: A read-only uint64 array of max(1, 2^n / 64) words.
+    """
+    formula = _as_formula(formula)
+    if variables is None:
+        variables = tuple(sorted(formula.variables))
+    return _packed_truth_table(formula, tuple(variables))
+
+
+def truth_table(formula, variables=None):
+    """
+    Returns a formula's truth table as one bool per row.
+    Args:
+        formula (Formula or str): The formula.
+        variables (tuple): The variable order; defaults to the formula's variables sorted by name.
+    Returns:
+        numpy.ndarray: A bool array of 2^n rows.
+    """
+    formula = _as_formula(formula)
+    if variables is None:
+        variables = tuple(sorted(formula.variables))
+    packed = packed_truth_table(formula, variables)
+    bits = np.unpackbits(packed.view(np.uint8), bitorder='little')
+    return bits[:1 << len(variables)].astype(bool)
+
+
+def table_matrix(formulas, variables=None):
+    """
+    Returns the packed truth tables of many formulas over the same variables.
+    Args:
+        formulas (list): Formulas or formula strings.
+        variables (tuple): The variable order; defaults to every variable used, sorted by name.
+    Returns:
+        numpy.ndarray: A uint64 array of shape (len(formulas), words).
+    """
+    formulas = [_as_formula(formula) for formula in formulas]
+    if variables is None:
+        variables = tuple(sorted(frozenset().union(*(f.variables for f in formulas))))
+    words = max(1, (1 << len(variables)) // 64)
+    matrix = np.empty((len(formulas), words), dtype=np.uint64)
+    for row, formula in enumerate(formulas):
+        matrix[row] = _packed_truth_table(formula, tuple(variables))
+    return matrix
+
+
+def equivalent(a, b):
+    """
+    Checks whether two formulas are logically equivalent.
+    Args:
+        a, b (Formula or str): The formulas.
+    Returns:
+        bool: True if they agree on every assignment of their variables.
+    """
+    a, b = _as_formula(a), _as_formula(b)
+    if a is b:
+        return True
+    variables = tuple(sorted(a.variables | b.variables))
+    return bool(np.array_equal(_packed_truth_table(a, variables), _packed_truth_table(b, variables)))
+
+
+def equivalence_classes(formulas, variables=None):
+    """
+    Groups formulas that are logically equivalent, e.g. to find duplicate options.
+    Args:
+        formulas (list): Formulas or formula strings.
+        variables (tuple): The variable order; defaults to every variable used, sorted by name.
+    Returns:
+        list[list[int]]: The indexes of the formulas in each group, in order of first appearance.
+    """
+    if not formulas:
+        return []
+    matrix = table_matrix(formulas, variables)
+    _, inverse = np.unique(matrix, axis=0, return_inverse=True)
+    groups = {}
+    for i, label in enumerate(inverse.ravel().tolist()):
+        groups.setdefault(label, []).append(i)
+    return list(groups.values())
@@ -0,0 +1,194 @@
+"""
+User directory for the login page.
+
+usernames.txt holds one student username per line and keys.txt one instructor
+key per line. Both are read once into memory and only read again when a file's
+modification time or size changes, so checking a login is a set lookup however
+many students are on the roster.
+
+Instructor keys are stored as salted PBKDF2 hashes, never as plain text, and
+are compared in constant time. Plain-text keys found in keys.txt are replaced
+by their hashes the first time it is loaded.
+
+Usage:
+    python user_directory.py add-user <username>
+    python user_directory.py add-key <key>
+
+Classes:
+    UserDirectory: The known usernames and instructor keys.
+
+Functions:
+    hash_key(key): Hashes an instructor key with a new random salt.
+    verify_key(key, stored): Checks a key against a stored hash.
+"""
+import hashlib
+import hmac
+import os
+import secrets
+import sys
+
+import persistence
+
+USERS_FILE = 'usernames.txt'
+KEYS_FILE = 'keys.txt'
+
+HASH_SCHEME = 'pbkdf2_sha256'
+HASH_ITERATIONS = 100_000
+
+
+def hash_key(key, salt=None, iterations=HASH_ITERATIONS):
+    """
+    Hashes an instructor key for storing in keys.txt.
+    Args:
+        key (str): The key.
+        salt (str): The salt as hex; a new random one by default.
+        iterations (int): The PBKDF2 iteration count.
+    Returns:
+        str: The hash, as "pbkdf2_sha256$iterations$salt$digest".
+    """
+    if salt is None:
+        salt = secrets.token_hex(16)
+    digest = hashlib.pbkdf2_hmac('sha256', key.encode(), bytes.fromhex(salt), iterations)
+    return f"{HASH_SCHEME}${iterations}${salt}${digest.hex()}"
+
+
+def is_hashed(line):
+    return line.startswith(HASH_SCHEME + '$') and line.count('$') == 3
+
+
+def verify_key(key, stored):
+    """
+    Checks a key against a hash made by hash_key().
+    Args:
+        key (str): The key that was entered.
+        stored (str): The stored hash.
+    Returns:
+        bool: True if the key matches.
+    """
+    try:
+        _, iterations, salt, _ = stored.split('$')
+        expected = hash_key(key, salt, int(iterations))
+    except ValueError:
+        return False
+    return hmac.compare_digest(expected, stored)
+
+
+def _file_key(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _lines(text):
+    return [line.strip() for line in text.splitlines() if line.strip()]
+
+
+def _with_line(text, line):
+    # Adds a line to a file's contents, keeping whatever was there
+    if text and not text.endswith('\n'):
+        text += '\n'
+    return text + line + '\n'
+
+
+class UserDirectory:
+    """
+    The known usernames and instructor keys, reloaded when their files change.
+
+    Methods:
+        refresh(): Reloads any file that changed since it was last read.
+        has_user(username): Whether a username is on the roster.
+        check_key(key): Whether a key is a valid instructor key.
+        add_user(username), add_key(key): Add to the files.
+    """
+    def __init__(self, users_path=USERS_FILE, keys_path=KEYS_FILE):
+        self.users_path = users_path
+        self.keys_path = keys_path
+        self.users = set()
+        self.key_hashes = []
+        self._users_key = None
+        self._keys_key = None
+        self.refresh()
+
+    def refresh(self):
+        users_key = _file_key(self.users_path)
+        if users_key != self._users_key:
+            self.users = set(_lines(persistence.read_text(self.users_path)))
+            self._users_key = users_key
+
+        keys_key = _file_key(self.keys_path)
+        if keys_key != self._keys_key:
+            lines = _lines(persistence.read_text(self.keys_path))
+            if not all(is_hashed(line) for line in lines):
+                lines = self._hash_plain_keys()
+            self.key_hashes = lines
+            self._keys_key = _file_key(self.keys_path)
+
+    def _hash_plain_keys(self):
+        hashed = []
+
+        def change(text):
+            # _lines() strips each line, so keys are hashed without the spaces check_key() ignores
+            hashed[:] = [line if is_hashed(line) else hash_key(line) for line in _lines(text)]
+            return ''.join(line + '\n' for line in hashed)
+
+        persistence.update(self.keys_path, change)
+        return hashed
+
+    def has_user(self, username):
+        """
+        Returns:
+            bool: True if the username is on the roster. Empty usernames never are.
+        """
+        username = username.strip()
+        return bool(username) and username in self.users
+
+    def check_key(self, key):
+        """
+        Returns:
+            bool: True if the key matches one of the instructor keys. Spaces around it are ignored.
+        """
+        key = key.strip()
+        if not key:
+            return False
+        # Check every hash rather than stopping at the first match, so the time
+        # taken does not tell which key matched
+        matched = False
+        for stored in self.key_hashes:
+            matched |= verify_key(key, stored)
+        return matched
+
+    def add_user(self, username):
+        username = username.strip()
+        if not username:
+            raise ValueError("username must not be empty")
+        persistence.update(self.users_path,
+                           lambda text: None if username in _lines(text) else _with_line(text, username))
+        self.refresh()
+
+    def add_key(self, key):
+        key = key.strip()
+        if not key:
+            raise ValueError("key must not be empty")
+        stored = hash_key(key)
+        persistence.update(self.keys_path, lambda text: _with_line(text, stored))
+        self.refresh()
+
+
+def main(argv):
+    if len(argv) != 2 or argv[0] not in ('add-user', 'add-key'):
+        print(__doc__)
+        return 1
+    directory = UserDirectory()
+    if argv[0] == 'add-user':
+        directory.add_user(argv[1])
+        print(f"Added user {argv[1].strip()}")
+    else:
+        directory.add_key(argv[1])
+        print("Added instructor key")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
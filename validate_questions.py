@@ -0,0 +1,280 @@
+"""
+Validator for the question files.
+
+Reads questions.txt, options.txt, answers.txt and difficulty.txt side by side
+in a single pass, one question at a time, so banks of any size are checked in
+constant memory. It reports:
+
+- misaligned numbering: lines that are not numbered, numbers that repeat, go
+  backwards or skip, and questions missing from one of the files,
+- answers that are not among their options, which make a question unwinnable,
+- options that are exact duplicates, or different ways of writing the same
+  formula (compared by truth table),
+- answers and options that do not parse,
+- option counts other than the usual four, e.g. where a missing "N." header
+  merged two questions' options, and difficulties that are not whole numbers.
+
+The per-question checks can run on a pool of processes for very large banks.
+The exit status is 1 if anything was reported.
+
+Usage:
+    python validate_questions.py [directory] [--jobs N] [--options N] [--json]
+
+Classes:
+    Issue: A problem found in the question files.
+    Record: One question's entries from the four files.
+
+Functions:
+    read_questions(directory, report): Yields each question's entries from the four files.
+    check_question(record): Checks one question's answer and options.
+    validate(directory, jobs, num_options): Yields every problem found.
+"""
+import argparse
+import concurrent.futures
+import heapq
+import json
+import os
+import sys
+from collections import deque, namedtuple
+
+from grading import AnswerKey, fingerprint
+from logic import LogicSyntaxError, parse
+from question_bank import (ANSWERS_FILE, DIFFICULTY_FILE, OPTIONS_FILE, QUESTIONS_FILE,
+                           iter_numbered, iter_options)
+
+NUM_OPTIONS = 4
+# Questions sent to a worker process at a time
+BATCH_SIZE = 256
+
+Issue = namedtuple('Issue', ['path', 'line', 'number', 'kind', 'message'])
+
+# The entries of one question: the number, then (line, text) from each file, or None where it is missing
+Record = namedtuple('Record', ['number', 'question', 'options', 'answer', 'difficulty'])
+
+_FIELDS = ('question', 'options', 'answer', 'difficulty')
+
+
+def _stream(path, reader, field, report):
+    # Yields (number, field, line, value) for one file, reporting lines that break the numbering
+    previous = None
+    for line, number, value in reader(path):
+        if number is None:
+            what = "option before any 'N.' header" if reader is iter_options else "line is not numbered"
+            report(Issue(path, line, None, 'numbering', f"{what}: {value!r}"))
+            continue
+        if previous is not None:
+            if number == previous:
+                report(Issue(path, line, number, 'numbering', f"question {number} appears twice"))
+                continue
+            if number < previous:
+                report(Issue(path, line, number, 'numbering',
+                             f"question {number} comes after question {previous}"))
+                continue
+            if field == 'question' and number != previous + 1:
+                report(Issue(path, line, number, 'numbering',
+                             f"question {number} follows question {previous}; numbers are skipped"))
+        previous = number
+        yield number, field, line, value
+
+
+def read_questions(directory, report):
+    """
+    Reads the four question files side by side, joining their entries by question number.
+    Args:
+        directory (str): The directory holding the question files.
+        report (function): Called with an Issue for every numbering problem.
+    Yields:
+        Record: One question's entries; an entry is (line, text) or None if its file has none.
+    """
+    paths = {
+        'question': os.path.join(directory, QUESTIONS_FILE),
+        'options': os.path.join(directory, OPTIONS_FILE),
+        'answer': os.path.join(directory, ANSWERS_FILE),
+        'difficulty': os.path.join(directory, DIFFICULTY_FILE),
+    }
+    streams = []
+    for field, path in paths.items():
+        if field == 'difficulty' and not os.path.exists(path):
+            continue
+        reader = iter_options if field == 'options' else iter_numbered
+        streams.append(_stream(path, reader, field, report))
+
+    # Every file is in question order, so a merge on the number lines them up without holding them
+    record = None
+    for number, field, line, value in heapq.merge(*streams, key=lambda entry: entry[0]):
+        if record is None or record['number'] != number:
+            if record is not None:
+                yield _finish(record, paths, report)
+            record = dict.fromkeys(_FIELDS)
+            record['number'] = number
+        record[field] = (line, value)
+    if record is not None:
+        yield _finish(record, paths, report)
+
+
+def _finish(record, paths, report):
+    number = record['number']
+    for field in ('question', 'options', 'answer'):
+        if record[field] is None:
+            others = [f for f in _FIELDS if record[f] is not None]
+            path = paths[others[0]]
+            report(Issue(paths[field], None, number, 'misaligned',
+                         f"question {number} is in {os.path.basename(path)} but not in "
+                         f"{os.path.basename(paths[field])}"))
+    return Record(**record)
+
+
+def check_question(record, paths, num_options=NUM_OPTIONS):
+    """
+    Checks one question's answer, options and difficulty.
+    Args:
+        record (Record): The question's entries.
+        paths (dict): The file path of each field, for the report.
+        num_options (int): How many options a question should have.
+    Returns:
+        list[Issue]: The problems found.
+    """
+    issues = []
+    number = record.number
+
+    if record.difficulty is not None:
+        line, text = record.difficulty
+        if not text.strip().lstrip('-').isdigit():
+            issues.append(Issue(paths['difficulty'], line, number, 'difficulty',
+                                f"difficulty {text!r} is not a whole number"))
+    if record.question is not None and not record.question[1]:
+        issues.append(Issue(paths['question'], record.question[0], number, 'empty', "question text is empty"))
+    if record.options is None:
+        return issues
+
+    line, options = record.options
+    if len(options) != num_options:
+        issues.append(Issue(paths['options'], line, number, 'option-count',
+                            f"{len(options)} options instead of {num_options}"))
+
+    formulas = []
+    for option in options:
+        try:
+            formulas.append((option, parse(option)))
+        except LogicSyntaxError as e:
+            issues.append(Issue(paths['options'], line, number, 'parse-error', f"option {option!r}: {e}"))
+
+    seen = set()
+    for option in options:
+        if option in seen:
+            issues.append(Issue(paths['options'], line, number, 'duplicate', f"option {option!r} appears twice"))
+        seen.add(option)
+    # A handful of options is grouped faster by fingerprint than by truth_table.equivalence_classes
+    distinct = dict(formulas)
+    variables = tuple(sorted(frozenset().union(*(formula.variables for formula in distinct.values()))))
+    groups = {}
+    for text, formula in distinct.items():
+        groups.setdefault(fingerprint(formula, variables), []).append(text)
+    for group in groups.values():
+        if len(group) > 1:
+            texts = ', '.join(repr(text) for text in group)
+            issues.append(Issue(paths['options'], line, number, 'equivalent',
+                                f"options {texts} mean the same thing"))
+
+    if record.answer is not None:
+        answer_line, answer = record.answer
+        try:
+            parse(answer)
+        except LogicSyntaxError as e:
+            issues.append(Issue(paths['answer'], answer_line, number, 'parse-error', f"answer {answer!r}: {e}"))
+        # Grading is by meaning, so an equivalent option also wins the question
+        key = AnswerKey(answer, options)
+        if not any(key.accepts(option) for option in options):
+            issues.append(Issue(paths['answer'], answer_line, number, 'answer-missing',
+                                f"answer {answer!r} is not among the options, so the question cannot be won"))
+    return issues
+
+
+def _check_batch(records, paths, num_options):
+    issues = []
+    for record in records:
+        issues.extend(check_question(record, paths, num_options))
+    return issues
+
+
+def _batches(records, size):
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def validate(directory='.', jobs=1, num_options=NUM_OPTIONS):
+    """
+    Checks the question files in a directory.
+    Args:
+        directory (str): The directory holding the question files.
+        jobs (int): How many processes check questions; 1 checks them in this process.
+        num_options (int): How many options a question should have.
+    Yields:
+        Issue: Each problem found, in question order within each kind of check.
+    """
+    paths = {
+        'question': os.path.join(directory, QUESTIONS_FILE),
+        'options': os.path.join(directory, OPTIONS_FILE),
+        'answer': os.path.join(directory, ANSWERS_FILE),
+        'difficulty': os.path.join(directory, DIFFICULTY_FILE),
+    }
+    for path in (paths['question'], paths['options'], paths['answer']):
+        if not os.path.exists(path):
+            yield Issue(path, None, None, 'missing-file', "file not found")
+            return
+
+    found = []
+    batches = _batches(read_questions(directory, found.append), BATCH_SIZE)
+
+    if jobs == 1:
+        for batch in batches:
+            yield from found
+            found.clear()
+            yield from _check_batch(batch, paths, num_options)
+    else:
+        with concurrent.futures.ProcessPoolExecutor(jobs) as executor:
+            # Only a few batches are in flight at once, so the files are still read as they are checked
+            pending = deque()
+            for batch in batches:
+                pending.append(executor.submit(_check_batch, batch, paths, num_options))
+                if len(pending) >= 2 * jobs:
+                    yield from found
+                    found.clear()
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+    yield from found
+
+
+def _format(issue):
+    location = issue.path if issue.line is None else f"{issue.path}:{issue.line}"
+    question = f" question {issue.number}:" if issue.number is not None else ""
+    return f"{location}:{question} [{issue.kind}] {issue.message}"
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Check the question files for problems.")
+    parser.add_argument('directory', nargs='?', default='.', help="directory holding the question files")
+    parser.add_argument('--jobs', type=int, default=1, help="processes to check questions with; 0 for one per CPU")
+    parser.add_argument('--options', type=int, default=NUM_OPTIONS, help="how many options each question should have")
+    parser.add_argument('--json', action='store_true', help="print one JSON object per problem")
+    args = parser.parse_args(argv)
+
+    jobs = args.jobs or os.cpu_count() or 1
+    count = 0
+    for issue in validate(args.directory, jobs, args.options):
+        count += 1
+        print(json.dumps(issue._asdict()) if args.json else _format(issue))
+    if not args.json:
+        print(f"{count} problem{'s' if count != 1 else ''} found")
+    return 1 if count else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
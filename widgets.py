@@ -0,0 +1,242 @@
+"""
+Widgets shared by the game screens.
+
+Classes:
+    Button: A class for creating and managing buttons in the interface.
+    DraggableItem: A class for creating draggable items used as answer choices.
+    DragDispatcher: Passes mouse events only to the draggable items they concern.
+
+Functions:
+    draw_outline(win, color, rect, width): Draws a rectangle's border.
+    create_draggable_items(...): Creates draggable items for a question's answer choices.
+"""
+import pygame
+
+import assets
+import profiler
+import text_cache
+from hit_grid import HitGrid
+
+black = (10, 10, 10)
+grey = (112, 128, 144)
+
+
+class Button:
+    """
+    Class for creating interactive buttons in the interface.
+
+    Attributes:
+        color (tuple): The color of the button.
+        x, y (int): The x and y coordinates of the button.
+        width, height (int): The width and height of the button.
+        text (str): The text displayed on the button.
+
+    Methods:
+        draw(win, outline): Draws the button on the specified window.
+        is_over(pos): Checks if the button is hovered over or clicked.
+        place(rect): Moves and resizes the button to a rectangle.
+        rect: The area the button covers.
+    """
+    def __init__(self, color, x, y, width, height, text=''):
+        self.color = color
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.text = text
+
+    def draw(self, win, outline=None):
+        if outline:
+            pygame.draw.rect(win, outline, (self.x-2, self.y-2, self.width+4, self.height+4), 0)
+
+        pygame.draw.rect(win, self.color, (self.x, self.y, self.width, self.height), 0)
+
+        if self.text != '':
+            font = assets.get_font('arial', 20)
+            text = text_cache.render(font, self.text, (0, 0, 0))
+            win.blit(text, (self.x + (self.width/2 - text.get_width()/2), self.y + (self.height/2 - text.get_height()/2)))
+
+    def is_over(self, pos):
+        # Pos is the mouse position or a tuple of (x,y) coordinates
+        if self.x < pos[0] < self.x + self.width:
+            if self.y < pos[1] < self.y + self.height:
+                return True
+        return False
+
+    def place(self, rect):
+        self.x, self.y, self.width, self.height = rect
+
+    @property
+    def rect(self):
+        return pygame.Rect(self.x, self.y, self.width, self.height)
+
+
+class DraggableItem:
+    """
+    Class for creating draggable items representing answer choices.
+
+    Attributes:
+        text (str): The text displayed on the draggable item.
+        rect (pygame.Rect): The rectangle defining the size and position.
+        font (pygame.font.Font): The font used for rendering text.
+        sol (bool): Whether this item is the correct answer.
+        sol_box (tuple): The (x, y, width, height) of the answer area.
+        drop_rect (pygame.Rect): The answer area, made once for the drop checks.
+
+    Methods:
+        draw(win): Draws the draggable item on the specified window.
+        bounds(): Returns the area the item covers when drawn.
+        handle_event(event, dirty): Handles events related to dragging the item.
+        check_collision_with_ans(): Checks if the item collides with the answer area.
+        is_ans(): Checks if the item is the correct answer.
+    """
+    def __init__(self, text, x, y, w, h, font, sol, sol_box):
+        self.text = text
+        self.rect = pygame.Rect(x, y, w, h)
+        self.font = font
+        self.dragging = False
+        self.offset_x = 0
+        self.offset_y = 0
+        self.sol = sol
+        self.sol_box = sol_box
+        self.drop_rect = pygame.Rect(sol_box)
+
+    def draw(self, win):
+        pygame.draw.rect(win, grey, self.rect)
+        text_surface = text_cache.render(self.font, self.text, black)
+        win.blit(text_surface, (self.rect.x + 5, self.rect.y + 5))
+
+    def bounds(self):
+        # The text can stick out past the grey box
+        text_surface = text_cache.render(self.font, self.text, black)
+        return self.rect.union(text_surface.get_rect(topleft=(self.rect.x + 5, self.rect.y + 5)))
+
+    def handle_event(self, event, dirty=None):
+        """
+        Handles events related to dragging the item.
+        Args:
+            event (pygame.event.Event): The event.
+            dirty (DirtyRegion): If given, the areas the item moved from and to are marked dirty.
+        """
+        if dirty is not None and event.type == pygame.MOUSEMOTION and self.dragging:
+            dirty.add(self.bounds())
+            self._handle_event(event)
+            dirty.add(self.bounds())
+        else:
+            self._handle_event(event)
+
+    def _handle_event(self, event):
+        if event.type == pygame.MOUSEBUTTONDOWN:
+            if self.rect.collidepoint(event.pos):
+                self.dragging = True
+                mouse_x, mouse_y = event.pos
+                self.offset_x = self.rect.x - mouse_x
+                self.offset_y = self.rect.y - mouse_y
+        elif event.type == pygame.MOUSEBUTTONUP:
+            self.dragging = False
+        elif event.type == pygame.MOUSEMOTION:
+            if self.dragging:
+                mouse_x, mouse_y = event.pos
+                self.rect.x = mouse_x + self.offset_x
+                self.rect.y = mouse_y + self.offset_y
+
+    def check_collision_with_ans(self):
+        return self.rect.colliderect(self.drop_rect)
+
+    def is_ans(self):
+        if self.sol:
+            return True
+        return False
+
+
+class DragDispatcher:
+    """
+    Passes mouse events only to the draggable items they concern: a press to the
+    topmost item under the cursor, and motion and the release to the item being
+    dragged. Items are found through a HitGrid, which is updated when an item is
+    dropped.
+
+    Attributes:
+        items (list[DraggableItem]): The items, in the order they are drawn.
+        dragged (DraggableItem): The item being dragged, if any.
+
+    Methods:
+        handle_event(event, dirty): Dispatches an event and returns the item it dropped, if any.
+    """
+    def __init__(self, items):
+        self.items = items
+        self.dragged = None
+        self.grid = HitGrid()
+        for item in items:
+            self.grid.add(item, item.rect)
+
+    @profiler.timed('dispatch')
+    def handle_event(self, event, dirty=None):
+        """
+        Dispatches a mouse event to the item it concerns.
+        Args:
+            event (pygame.event.Event): The event.
+            dirty (DirtyRegion): If given, the areas the dragged item moved from and to are marked dirty.
+        Returns:
+            DraggableItem: The item the event dropped, or None.
+        """
+        if event.type == pygame.MOUSEBUTTONDOWN:
+            item = self.grid.topmost(event.pos)
+            if item is not None:
+                item.handle_event(event, dirty)
+                self.dragged = item
+        elif event.type == pygame.MOUSEMOTION:
+            if self.dragged is not None:
+                self.dragged.handle_event(event, dirty)
+        elif event.type == pygame.MOUSEBUTTONUP:
+            item = self.dragged
+            if item is not None:
+                item.handle_event(event, dirty)
+                self.grid.move(item, item.rect)
+                self.dragged = None
+                return item
+        return None
+
+
+def create_draggable_items(options, key, font, width, y, sol_box, item_width=100, spacing=120):
+    """
+    Creates draggable items for a question's answer choices, centred on the screen.
+    Args:
+        options (list[str]): The answer choices, possibly starting with the "N." header line.
+        key (AnswerKey): The answer key; options equivalent to the answer are marked correct.
+        font (pygame.font.Font): The font used for the item text.
+        width (int): The width of the window.
+        y (int): The y coordinate of the answer bank.
+        sol_box (tuple): The (x, y, width, height) of the answer area.
+    Returns:
+        list[DraggableItem]: One item per answer choice.
+    """
+    if options[0].strip().endswith('.'):
+        options = options[1:]
+
+    total_width = (len(options) - 1) * spacing + len(options) * item_width
+    start_x = (width - total_width) // 2  # Center the options
+    drag_items = []
+    for i, text in enumerate(options):
+        drag_items.append(
+            DraggableItem(text, start_x + i * (item_width + spacing), y, item_width, 50,
+                          font, key.accepts(text), sol_box))
+    return drag_items
+
+
+def draw_outline(win, color, rect, width=1):
+    """
+    Draws a rectangle's border as four filled strips. pygame.draw.rect puts the
+    pixels of a thick border in different places when drawing is clipped, so a
+    border redrawn in a dirty area would not match the rest of it.
+    Args:
+        win (pygame.Surface): The surface to draw on.
+        color (tuple): The border color.
+        rect (pygame.Rect or tuple): The outside of the border.
+        width (int): The border thickness in pixels.
+    """
+    rect = pygame.Rect(rect)
+    win.fill(color, (rect.left, rect.top, rect.width, width))
+    win.fill(color, (rect.left, rect.bottom - width, rect.width, width))
+    win.fill(color, (rect.left, rect.top, width, rect.height))
+    win.fill(color, (rect.right - width, rect.top, width, rect.height))